@@ -24,7 +24,7 @@ if config.config_file_name is not None:
 # Set database URL from environment
 config.set_main_option(
     "sqlalchemy.url",
-    settings.DATABASE_URL.replace("+asyncpg", "")  # Use sync driver for migrations
+    settings.SYNC_DATABASE_URL  # Use sync driver for migrations
 )
 
 target_metadata = Base.metadata
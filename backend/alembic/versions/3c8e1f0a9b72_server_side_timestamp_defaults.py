@@ -0,0 +1,40 @@
+"""Generate created_at/updated_at defaults in the database
+
+Revision ID: 3c8e1f0a9b72
+Revises: 4be5e02bf74e
+Create Date: 2026-10-16 10:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e1f0a9b72'
+down_revision = '4be5e02bf74e'
+branch_labels = None
+depends_on = None
+
+
+# (table, column) pairs whose default moves from Python to Postgres
+TIMESTAMP_COLUMNS = [
+    ('samples', 'created_at'),
+    ('samples', 'updated_at'),
+    ('collections', 'created_at'),
+    ('collection_samples', 'created_at'),
+    ('instagram_creators', 'created_at'),
+    ('instagram_creators', 'updated_at'),
+    ('credit_transactions', 'created_at'),
+    ('credit_transactions', 'updated_at'),
+]
+
+
+def upgrade() -> None:
+    # Naive UTC, matching the values utcnow_naive() wrote before
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.text("timezone('utc', now())"))
+
+
+def downgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=None)
@@ -0,0 +1,26 @@
+"""Drop idx_credit_tx_user (covered by the user_id composite indexes)
+
+Revision ID: 5d2a7c4e8f13
+Revises: 3c8e1f0a9b72
+Create Date: 2026-10-16 10:41:07.532916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a7c4e8f13'
+down_revision = '3c8e1f0a9b72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # user_id is the leading column of idx_credit_tx_user_created and
+    # idx_credit_tx_user_type, so the single-column index only costs writes
+    op.drop_index('idx_credit_tx_user', table_name='credit_transactions')
+
+
+def downgrade() -> None:
+    op.create_index('idx_credit_tx_user', 'credit_transactions', ['user_id'], unique=False)
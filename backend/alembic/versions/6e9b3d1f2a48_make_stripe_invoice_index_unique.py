@@ -0,0 +1,27 @@
+"""Make the credit_transactions stripe_invoice_id index unique
+
+Revision ID: 6e9b3d1f2a48
+Revises: 5d2a7c4e8f13
+Create Date: 2026-10-16 11:05:52.204671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e9b3d1f2a48'
+down_revision = '5d2a7c4e8f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fails if an invoice was already credited twice - resolve those rows first
+    op.create_index('idx_credit_tx_stripe_invoice_uniq', 'credit_transactions', ['stripe_invoice_id'], unique=True, postgresql_where=sa.text('stripe_invoice_id IS NOT NULL'))
+    op.drop_index('idx_credit_tx_stripe_invoice', table_name='credit_transactions', postgresql_where=sa.text('stripe_invoice_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.create_index('idx_credit_tx_stripe_invoice', 'credit_transactions', ['stripe_invoice_id'], unique=False, postgresql_where=sa.text('stripe_invoice_id IS NOT NULL'))
+    op.drop_index('idx_credit_tx_stripe_invoice_uniq', table_name='credit_transactions', postgresql_where=sa.text('stripe_invoice_id IS NOT NULL'))
@@ -0,0 +1,46 @@
+"""Store sample and collection status as VARCHAR + CHECK instead of ENUM types
+
+Revision ID: 7f1c5a2e9d34
+Revises: 6e9b3d1f2a48
+Create Date: 2026-10-16 11:31:18.640392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f1c5a2e9d34'
+down_revision = '6e9b3d1f2a48'
+branch_labels = None
+depends_on = None
+
+
+# (table, enum type, check constraint, labels) - the stored labels are unchanged
+STATUS_COLUMNS = [
+    ('samples', 'processingstatus', 'ck_samples_status', ['PENDING', 'PROCESSING', 'COMPLETED', 'FAILED']),
+    ('collections', 'collectionstatus', 'ck_collections_status', ['pending', 'processing', 'completed', 'failed']),
+]
+
+
+def upgrade() -> None:
+    for table, enum_name, constraint_name, labels in STATUS_COLUMNS:
+        op.alter_column(table, 'status', type_=sa.String(20), postgresql_using='status::text')
+        op.create_check_constraint(
+            constraint_name,
+            table,
+            "status IN (" + ", ".join(f"'{label}'" for label in labels) + ")"
+        )
+        op.execute(f'DROP TYPE {enum_name}')
+
+
+def downgrade() -> None:
+    for table, enum_name, constraint_name, labels in STATUS_COLUMNS:
+        op.drop_constraint(constraint_name, table, type_='check')
+        sa.Enum(*labels, name=enum_name).create(op.get_bind())
+        op.alter_column(
+            table,
+            'status',
+            type_=sa.Enum(*labels, name=enum_name),
+            postgresql_using=f'status::{enum_name}'
+        )
@@ -0,0 +1,26 @@
+"""Use a BRIN index for credit_transactions.created_at
+
+Revision ID: 8a4d6b3f1c57
+Revises: 7f1c5a2e9d34
+Create Date: 2026-10-16 11:58:43.901257
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d6b3f1c57'
+down_revision = '7f1c5a2e9d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_credit_tx_created', table_name='credit_transactions')
+    op.create_index('idx_credit_tx_created', 'credit_transactions', ['created_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_credit_tx_created', table_name='credit_transactions')
+    op.create_index('idx_credit_tx_created', 'credit_transactions', ['created_at'], unique=False)
@@ -0,0 +1,29 @@
+"""Include sample_id in ix_collection_samples_position
+
+Revision ID: 9b5e7c4a2d68
+Revises: 8a4d6b3f1c57
+Create Date: 2026-10-16 12:20:09.377415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b5e7c4a2d68'
+down_revision = '8a4d6b3f1c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_collection_samples_position', table_name='collection_samples')
+    op.create_index('ix_collection_samples_position', 'collection_samples', ['collection_id', 'position'], unique=False, postgresql_include=['sample_id'])
+    # Index-only scans skip the heap only for pages marked all-visible, so vacuum more often
+    op.execute('ALTER TABLE collection_samples SET (autovacuum_vacuum_scale_factor = 0.02)')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE collection_samples RESET (autovacuum_vacuum_scale_factor)')
+    op.drop_index('ix_collection_samples_position', table_name='collection_samples')
+    op.create_index('ix_collection_samples_position', 'collection_samples', ['collection_id', 'position'], unique=False)
@@ -0,0 +1,29 @@
+"""Widen sample engagement counts to bigint
+
+Revision ID: ac6f8d5b3e79
+Revises: 9b5e7c4a2d68
+Create Date: 2026-10-16 12:52:36.018844
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ac6f8d5b3e79'
+down_revision = '9b5e7c4a2d68'
+branch_labels = None
+depends_on = None
+
+
+COUNT_COLUMNS = ['view_count', 'like_count', 'share_count', 'comment_count']
+
+
+def upgrade() -> None:
+    for column in COUNT_COLUMNS:
+        op.alter_column('samples', column, existing_type=sa.Integer(), type_=sa.BigInteger())
+
+
+def downgrade() -> None:
+    for column in COUNT_COLUMNS:
+        op.alter_column('samples', column, existing_type=sa.BigInteger(), type_=sa.Integer())
@@ -0,0 +1,57 @@
+"""Store sample tags as text[] instead of JSONB
+
+Revision ID: bd7a9e6c4f81
+Revises: ac6f8d5b3e79
+Create Date: 2026-10-16 13:24:50.662173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bd7a9e6c4f81'
+down_revision = 'ac6f8d5b3e79'
+branch_labels = None
+depends_on = None
+
+
+def _replace_search_vector_function(tags_text_sql: str) -> None:
+    op.execute(f'''
+        CREATE OR REPLACE FUNCTION update_search_vector() RETURNS trigger AS $$
+        BEGIN
+          NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.creator_username, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce({tags_text_sql}, '')), 'D');
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    ''')
+
+
+def upgrade() -> None:
+    # The jsonb_ops GIN index can't survive the type change
+    op.execute('DROP INDEX IF EXISTS ix_samples_tags_gin')
+
+    # ALTER ... USING can't contain a subquery, so wrap the conversion in a function
+    op.execute('''
+        CREATE FUNCTION _jsonb_tags_to_array(tags jsonb) RETURNS text[] AS $$
+          SELECT ARRAY(SELECT jsonb_array_elements_text(tags))
+        $$ LANGUAGE sql IMMUTABLE;
+    ''')
+    op.execute('ALTER TABLE samples ALTER COLUMN tags TYPE text[] USING _jsonb_tags_to_array(tags)')
+    op.execute('DROP FUNCTION _jsonb_tags_to_array(jsonb)')
+
+    op.create_index('ix_samples_tags_gin', 'samples', ['tags'], unique=False, postgresql_using='gin', postgresql_ops={'tags': 'array_ops'})
+
+    _replace_search_vector_function("array_to_string(NEW.tags, ' ')")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_samples_tags_gin', table_name='samples', postgresql_using='gin')
+    op.execute('ALTER TABLE samples ALTER COLUMN tags TYPE jsonb USING to_jsonb(tags)')
+    op.execute('CREATE INDEX ix_samples_tags_gin ON samples USING GIN (tags)')
+
+    _replace_search_vector_function("(SELECT string_agg(value, ' ') FROM jsonb_array_elements_text(NEW.tags))")
@@ -0,0 +1,27 @@
+"""Add (creator_id, created_at DESC) indexes to samples
+
+Revision ID: ce8b1f7d5a92
+Revises: bd7a9e6c4f81
+Create Date: 2026-10-16 14:07:13.825530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce8b1f7d5a92'
+down_revision = 'bd7a9e6c4f81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Also serve as the FK indexes for the creator columns (samples has none today)
+    op.create_index('ix_samples_tt_creator_created', 'samples', ['tiktok_creator_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_samples_ig_creator_created', 'samples', ['instagram_creator_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_samples_ig_creator_created', table_name='samples')
+    op.drop_index('ix_samples_tt_creator_created', table_name='samples')
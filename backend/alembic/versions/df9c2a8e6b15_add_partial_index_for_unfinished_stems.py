@@ -0,0 +1,24 @@
+"""Add a partial index over unfinished stems
+
+Revision ID: df9c2a8e6b15
+Revises: ce8b1f7d5a92
+Create Date: 2026-10-16 14:38:27.290461
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'df9c2a8e6b15'
+down_revision = 'ce8b1f7d5a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stems_unfinished', 'stems', ['created_at'], unique=False, postgresql_where=sa.text("status IN ('PENDING', 'UPLOADING', 'PROCESSING', 'FAILED')"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stems_unfinished', table_name='stems', postgresql_where=sa.text("status IN ('PENDING', 'UPLOADING', 'PROCESSING', 'FAILED')"))
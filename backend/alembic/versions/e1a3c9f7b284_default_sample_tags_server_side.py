@@ -0,0 +1,24 @@
+"""Default samples.tags to an empty array in the database
+
+Revision ID: e1a3c9f7b284
+Revises: df9c2a8e6b15
+Create Date: 2026-10-16 15:12:55.407318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1a3c9f7b284'
+down_revision = 'df9c2a8e6b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('samples', 'tags', server_default=sa.text("'{}'"))
+
+
+def downgrade() -> None:
+    op.alter_column('samples', 'tags', server_default=None)
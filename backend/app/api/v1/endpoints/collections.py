@@ -564,24 +564,68 @@ async def list_user_collections(
     return response_list
 
 
+async def get_collection_samples_page(
+    db: AsyncSession,
+    collection_id: UUID,
+    after_position: Optional[int] = None,
+    limit: Optional[int] = None
+) -> tuple[List[Sample], Optional[int]]:
+    """
+    Fetch a collection's samples in position order, starting after `after_position`.
+
+    Keyset pagination: the (collection_id, position) index seeks straight to the
+    page, so deep pages cost the same as the first instead of reading and
+    discarding every earlier row as OFFSET would.
+
+    Returns:
+        tuple[List[Sample], Optional[int]]: (samples, position to pass for the
+        next page, or None when this is the last page)
+    """
+    query = (
+        select(Sample, CollectionSample.position)
+        .join(CollectionSample, Sample.id == CollectionSample.sample_id)
+        .where(CollectionSample.collection_id == collection_id)
+        .order_by(CollectionSample.position)
+        .options(selectinload(Sample.tiktok_creator))  # Eagerly load creator to avoid lazy-load issues
+    )
+    if after_position is not None:
+        query = query.where(CollectionSample.position > after_position)
+    if limit is not None:
+        # Fetch one extra row to tell whether another page follows
+        query = query.limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    next_position = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_position = rows[-1].position
+
+    return [row.Sample for row in rows], next_position
+
+
 @router.get("/{collection_id}", response_model=CollectionWithSamplesResponse)
 @limiter.limit(f"{settings.COLLECTIONS_LIST_RATE_LIMIT_PER_MINUTE}/minute")
 async def get_collection_details(
     request: Request,
     collection_id: UUID,
+    limit: Optional[int] = Query(default=None, ge=1, le=100, description="Samples per page (omit for all samples)"),
+    after_position: Optional[int] = Query(default=None, ge=0, description="Return samples after this position (samples_next_position from the previous page)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get collection details with all associated samples
+    Get collection details with its samples, optionally one page at a time
 
     Args:
         collection_id: UUID of the collection
+        limit: Page size; all samples are returned when omitted
+        after_position: Keyset cursor from the previous page's samples_next_position
 
     Returns:
         Collection with samples
     """
-    # Get collection with samples (using eager loading)
     query = (
         select(Collection)
         .where(
@@ -590,11 +634,6 @@ async def get_collection_details(
                 Collection.user_id == current_user.id
             )
         )
-        .options(
-            selectinload(Collection.collection_samples)
-            .selectinload(CollectionSample.sample)
-            .selectinload(Sample.tiktok_creator)  # Eagerly load creator to avoid lazy-load issues
-        )
     )
 
     result = await db.execute(query)
@@ -606,19 +645,12 @@ async def get_collection_details(
     # Build response with samples in order
     collection_dict = CollectionResponse.model_validate(collection).model_dump()
 
-    # Sort by position and convert to SampleResponse
-    sorted_collection_samples = sorted(
-        collection.collection_samples,
-        key=lambda cs: cs.position
+    samples, next_position = await get_collection_samples_page(
+        db, collection.id, after_position=after_position, limit=limit
     )
 
-    samples = [
-        SampleResponse.model_validate(cs.sample)
-        for cs in sorted_collection_samples
-        if cs.sample  # Ensure sample exists
-    ]
-
-    collection_dict['samples'] = samples
+    collection_dict['samples'] = [SampleResponse.model_validate(sample) for sample in samples]
+    collection_dict['samples_next_position'] = next_position
 
     return CollectionWithSamplesResponse(**collection_dict)
 
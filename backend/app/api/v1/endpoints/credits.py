@@ -94,9 +94,11 @@ async def get_credit_transactions(
     Returns:
         Paginated list of transactions
     """
-    # Get total count
+    # Get total count - count(*) rather than count(id) so Postgres can answer it
+    # from idx_credit_tx_user_created with an index-only scan
     count_result = await db.execute(
-        select(func.count(CreditTransaction.id))
+        select(func.count())
+        .select_from(CreditTransaction)
         .where(CreditTransaction.user_id == current_user.id)
     )
     total = count_result.scalar_one()
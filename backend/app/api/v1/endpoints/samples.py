@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Body
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, text, cast, String
+from sqlalchemy import select, func, and_, or_, text, cast, Text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
@@ -206,9 +206,9 @@ async def get_samples(
         # Parse tags (already validated and normalized by Pydantic schema)
         tag_list = [t.strip().lower() for t in tags.split(",") if t.strip()]
 
-        # Use JSONB ?| operator: checks if any of the array elements exist
+        # Array overlap (&&): matches if any of the tags is present, served by the GIN index
         query = query.where(
-            Sample.tags.op('?|')(cast(tag_list, ARRAY(String)))
+            Sample.tags.op('&&')(cast(tag_list, ARRAY(Text)))
         )
 
     # Full-text search with PostgreSQL tsvector
@@ -316,7 +316,7 @@ async def get_popular_tags(
     Get most popular tags across all samples
     Returns list of {tag: str, count: int}
 
-    Performance note: This query uses jsonb_array_elements_text() which expands
+    Performance note: This query uses unnest() which expands
     all tag arrays. At scale (>10K samples), consider:
     - Denormalized sample_tags table with indexes
     - Materialized view refreshed hourly
@@ -326,7 +326,7 @@ async def get_popular_tags(
 
     try:
         query = select(
-            func.jsonb_array_elements_text(Sample.tags).label('tag'),
+            func.unnest(Sample.tags).label('tag'),
             func.count().label('count')
         ).where(
             Sample.status == ProcessingStatus.COMPLETED
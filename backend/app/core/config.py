@@ -35,6 +35,17 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 10  # Persistent connections kept per process
+    DATABASE_MAX_OVERFLOW: int = 20  # Extra connections allowed under burst load
+    DATABASE_POOL_RECYCLE: int = 300  # Seconds before a pooled connection is replaced
+    DATABASE_POOL_PRE_PING: bool = True  # Check connections on checkout so workers survive DB restarts
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500  # Prepared statements cached per connection (0 disables, e.g. behind pgbouncer)
+
+    # Sync-driver URL (psycopg2) for migrations and one-off scripts - derived once
+    # here instead of string-replacing DATABASE_URL at each call site
+    @property
+    def SYNC_DATABASE_URL(self) -> str:
+        return self.DATABASE_URL.replace("+asyncpg", "")
 
     # Inngest
     INNGEST_EVENT_KEY: Optional[str] = None  # Optional - only needed for production
@@ -48,6 +59,10 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: str = "sampletok-samples"
     S3_ENDPOINT_URL: Optional[str] = None
+    S3_MULTIPART_THRESHOLD_MB: int = 16  # Files above this size are uploaded in concurrent parts
+    S3_MULTIPART_CHUNKSIZE_MB: int = 16  # Part size for multipart uploads (try 64 on fast links)
+    S3_MAX_CONCURRENCY: int = 8  # Concurrent part transfers per file
+    S3_MAX_RETRY_ATTEMPTS: int = 5  # Attempts per S3 request (each multipart part retries on its own)
 
     # R2-specific (Cloudflare)
     R2_PUBLIC_DOMAIN: Optional[str] = None  # Custom domain for R2 public access
@@ -69,6 +84,8 @@ class Settings(BaseSettings):
     TIKTOK_API_RETRY_ATTEMPTS: int = 3  # Number of retry attempts for inconsistent TikTok API responses
     TIKTOK_API_TIMEOUT_SECONDS: int = 30  # HTTP timeout for TikTok API requests
     CREATOR_CACHE_TTL_HOURS: int = 24  # How long to cache TikTok creator info
+    CREATOR_ID_CACHE_TTL_SECONDS: int = 300  # In-process creator -> creator ID cache used by the processing pipeline
+    TIKTOK_VIDEO_DATA_CACHE_TTL_SECONDS: int = 600  # In-process URL -> video API response cache (CDN play URLs expire, keep it short)
 
     # Rate Limiting
     COLLECTION_RATE_LIMIT_PER_MINUTE: int = 10  # Max collection processing requests per minute per user
@@ -85,6 +102,16 @@ class Settings(BaseSettings):
     WAVEFORM_WIDTH: int = 800
     WAVEFORM_HEIGHT: int = 320
 
+    # Processing Pipeline (per-worker stage concurrency limits)
+    PIPELINE_DOWNLOAD_CONCURRENCY: int = 2  # Concurrent video downloads
+    PIPELINE_AUDIO_CONCURRENCY: int = 4  # Concurrent ffmpeg jobs (extract, waveform, HLS)
+    PIPELINE_ANALYSIS_CONCURRENCY: int = 2  # Concurrent BPM/key analyses (CPU-bound)
+    PIPELINE_UPLOAD_CONCURRENCY: int = 8  # Concurrent storage uploads
+    PIPELINE_MAX_CONCURRENT_VIDEOS: int = 4  # Videos processed at once per pipeline (enforced by Inngest across workers)
+    PIPELINE_ANALYSIS_WORKERS: Optional[int] = None  # Analysis process pool size (defaults to CPU count)
+    PROCESSING_TEMP_DIR: Optional[str] = None  # Scratch dir for intermediate files, e.g. /dev/shm (defaults to the system temp dir)
+    STALE_TEMP_DIR_MAX_AGE_MINUTES: int = 60  # Temp dirs untouched this long are removed by the periodic cleanup (left by crashed/failed runs)
+
     # RapidAPI Settings (must be set in .env)
     RAPIDAPI_KEY: str  # Required - no default for security
     RAPIDAPI_HOST: str = "tiktok-video-no-watermark2.p.rapidapi.com"
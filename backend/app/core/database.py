@@ -1,3 +1,8 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
@@ -5,7 +10,23 @@ from app.core.config import settings
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    future=True
+    future=True,
+    # Sized for concurrent pipeline steps, so sessions reuse pooled connections
+    # instead of opening new ones once the default pool (5 + 10 overflow) is exhausted
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    # Long-lived workers sit idle between jobs - recycle and ping pooled connections
+    # so a step never fails on one the server or a proxy has already dropped
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    connect_args={
+        # Every query is parameterized, so a larger per-connection prepared
+        # statement cache (asyncpg dialect default: 100) keeps the pipeline's and
+        # the API's statements prepared across sessions on pooled connections
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        # Our queries are short OLTP lookups - JIT compilation only adds planning latency
+        "server_settings": {"jit": "off"}
+    }
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -16,6 +37,12 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# DB-side equivalent of utcnow_naive() for timestamp column defaults - Postgres
+# fills the value in, so inserts don't build and bind a datetime per row.
+# Models using it set eager_defaults so the generated value comes back via
+# RETURNING instead of needing a lazy load (which async sessions can't do)
+utcnow_sql = func.timezone('utc', func.now())
+
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -26,4 +53,52 @@ async def get_db() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+# Session shared by all DB helpers running inside one background job invocation
+_current_session: ContextVar[Optional[AsyncSession]] = ContextVar("db_session", default=None)
+
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[AsyncSession]:
+    """
+    Open one session for the duration of a background job and make it the
+    current session for every session_scope() call made within it.
+
+    Commits stay explicit in each helper. The session is not safe for concurrent
+    use, so helpers run under asyncio.gather must not share it.
+    """
+    existing = _current_session.get()
+    if existing is not None:
+        yield existing
+        return
+
+    async with AsyncSessionLocal() as session:
+        token = _current_session.set(session)
+        try:
+            yield session
+        finally:
+            _current_session.reset(token)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Yield the job's shared session if one is active, otherwise a fresh session.
+    Drop-in replacement for `async with AsyncSessionLocal() as db`.
+    """
+    session = _current_session.get()
+    if session is None:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    try:
+        yield session
+    finally:
+        # Mirror closing a fresh session: discard anything left uncommitted and
+        # hand the connection back so it isn't held idle-in-transaction across
+        # long non-DB steps (stem separation, uploads)
+        if session.in_transaction():
+            await session.rollback()
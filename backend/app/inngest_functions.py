@@ -3,11 +3,19 @@ Inngest functions for async processing of TikTok videos
 """
 import asyncio
 import inngest
+import os
+import random
+import re
+import subprocess
 import tempfile
+import time
 import logging
 from pathlib import Path
+from collections import OrderedDict
+from types import MappingProxyType
 import uuid
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Set
 from pydantic import BaseModel, Field, validator
 from uuid import UUID
 
@@ -16,21 +24,23 @@ from app.services.tiktok.downloader import TikTokDownloader
 from app.services.instagram.downloader import InstagramDownloader
 from app.services.audio.processor import AudioProcessor
 from app.services.audio.analyzer import AudioAnalyzer
+from app.services.audio.shared_audio import decode_to_shared_memory, release_shared_audio
 from app.services.audio.lalal_service import LalalAIService
 from app.services.storage.s3 import S3Storage
 from app.models import Sample, ProcessingStatus, TikTokCreator, Collection, CollectionSample, CollectionStatus, Stem, StemType, StemProcessingStatus
 from app.models.instagram_creator import InstagramCreator
 from app.models.user import UserDownload
-from app.core.database import AsyncSessionLocal
-from sqlalchemy import select, or_
-from sqlalchemy.exc import IntegrityError
+from app.core.database import AsyncSessionLocal, shared_session, session_scope
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.tiktok.creator_service import CreatorService
 from app.services.instagram.creator_service import CreatorService as InstagramCreatorService
 from app.services.tiktok.collection_service import TikTokCollectionService
 from app.services.credit_service import refund_credits_atomic, CreditService
 from app.utils import extract_hashtags, remove_hashtags, utcnow_naive
 from datetime import datetime
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -56,22 +66,70 @@ logger.info(f"Inngest config - app_id: sampletok, is_production: {settings.ENVIR
 
 inngest_client = inngest.Inngest(**inngest_kwargs)
 
+# Service singletons - these only hold config, so one instance per worker is
+# shared by every pipeline instead of being rebuilt in each step
+@lru_cache(maxsize=1)
+def _get_processor() -> AudioProcessor:
+    return AudioProcessor()
+
+
+@lru_cache(maxsize=1)
+def _get_analyzer() -> AudioAnalyzer:
+    return AudioAnalyzer()
+
+
+@lru_cache(maxsize=1)
+def _get_storage() -> S3Storage:
+    return S3Storage()
+
+
+@lru_cache(maxsize=1)
+def _get_tiktok_downloader() -> TikTokDownloader:
+    return TikTokDownloader()
+
+
+@lru_cache(maxsize=1)
+def _get_instagram_downloader() -> InstagramDownloader:
+    return InstagramDownloader()
+
+
+@lru_cache(maxsize=1)
+def _get_lalal_service() -> LalalAIService:
+    return LalalAIService()
+
+
+@lru_cache(maxsize=1024)
+def _parse_uuid(value: str) -> uuid.UUID:
+    return uuid.UUID(value)
+
+
+def _as_uuid(value: Union[str, uuid.UUID]) -> uuid.UUID:
+    """
+    Convert an ID from an event payload to a UUID. The same sample ID is
+    converted by several steps of one run (and again on every replay), so
+    the parse is cached instead of repeated per step.
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+    return _parse_uuid(value)
+
+
 @inngest_client.create_function(
     fn_id="process-tiktok-video",
     trigger=inngest.TriggerEvent(event="tiktok/video.submitted"),
-    retries=3
+    retries=3,
+    # Cap in-flight videos across all workers; the stage semaphores bound work within a worker
+    concurrency=[inngest.Concurrency(limit=settings.PIPELINE_MAX_CONCURRENT_VIDEOS)]
 )
 async def process_tiktok_video(ctx: inngest.Context) -> Dict[str, Any]:
     """
     Process a TikTok video through multiple steps:
-    1. Download video from TikTok
-    2. Upload video to our storage
-    3. Upload thumbnails/covers to our storage
-    4. Extract audio (WAV and MP3)
-    5. Generate waveform visualization
-    6. Analyze audio features (BPM, key detection)
-    7. Update database with results
-    8. Clean up temp files
+    1. Mark as processing and download video from TikTok
+    2. Upload video and thumbnails/covers to our storage
+    3. Extract audio (WAV and MP3), then generate waveform, analyze audio features
+       and generate the HLS stream concurrently
+    4. Update database with results and clean up temp files
+    Steps 2 and 3 only depend on the download and run as parallel steps.
     """
     event_data = ctx.event.data
     sample_id = event_data.get("sample_id")
@@ -79,15 +137,7 @@ async def process_tiktok_video(ctx: inngest.Context) -> Dict[str, Any]:
 
     logger.info(f"Processing TikTok video: {tiktok_url} for sample: {sample_id}")
 
-    # Step 1: Update status to processing
-    await ctx.step.run(
-        "update-status-processing",
-        update_sample_status,
-        sample_id,
-        ProcessingStatus.PROCESSING
-    )
-
-    # Step 2: Download video and get metadata
+    # Step 1: Mark as processing, download video and get metadata
     video_metadata = await ctx.step.run(
         "download-video",
         download_tiktok_video,
@@ -95,60 +145,38 @@ async def process_tiktok_video(ctx: inngest.Context) -> Dict[str, Any]:
         sample_id
     )
 
-    # Step 3: Upload video file to our storage
-    video_url = await ctx.step.run(
-        "upload-video",
-        upload_video_to_storage,
-        video_metadata["video_path"],
-        sample_id
-    )
-
-    # Step 4: Upload thumbnails/covers to our storage
+    # Steps 2 and 3 only depend on the download, so they run as parallel steps - the
+    # network-bound uploads overlap with ffmpeg-bound audio processing.
+    # Step 2: Upload the video file and thumbnails/covers to our storage
     # Use origin_cover_url if available (higher quality), otherwise fall back to thumbnail_url
+    # Step 3: Extract audio (WAV and MP3), then generate the waveform, analyze audio
+    # features (BPM, key) and build the HLS stream concurrently - all from the local WAV.
+    # Every artifact is uploaded to R2 as it's created.
     cover_url_to_use = video_metadata.get("origin_cover_url") or video_metadata.get("thumbnail_url")
-    media_urls = await ctx.step.run(
-        "upload-media",
-        upload_media_to_storage,
-        sample_id,
-        video_metadata.get("thumbnail_url"),
-        cover_url_to_use
-    )
-
-    # Step 5: Extract audio (creates WAV and MP3, uploads to R2, returns URLs)
-    audio_files = await ctx.step.run(
-        "extract-audio",
-        extract_audio_from_video,
-        video_metadata["video_path"],
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 6: Generate waveform (generates PNG, uploads to R2, returns URL)
-    waveform_url = await ctx.step.run(
-        "generate-waveform",
-        generate_waveform,
-        audio_files["wav_path"],
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 7: Generate HLS stream (generates m3u8 + segments, uploads to R2, returns playlist URL)
-    hls_url = await ctx.step.run(
-        "generate-hls-stream",
-        generate_hls_stream,
-        audio_files["wav_path"],  # Use WAV path (mp3_path not returned by extract_audio)
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 8: Analyze audio features (BPM, key detection)
-    audio_analysis = await ctx.step.run(
-        "analyze-audio-features",
-        analyze_audio_features,
-        audio_files["wav_path"]
-    )
-
-    # Step 9: Update database with results (all URLs are from our storage)
+    media_urls, audio_files = await ctx.group.parallel((
+        lambda: ctx.step.run(
+            "upload-video-and-media",
+            upload_video_and_media,
+            video_metadata["video_path"],
+            sample_id,
+            video_metadata.get("thumbnail_url"),
+            cover_url_to_use
+        ),
+        lambda: ctx.step.run(
+            "process-audio",
+            process_audio,
+            video_metadata["video_path"],
+            video_metadata["temp_dir"],
+            sample_id
+        ),
+    ))
+    video_url = media_urls["video"]
+    waveform_url = audio_files["waveform_url"]
+    audio_analysis = audio_files["analysis"]
+    hls_url = audio_files["hls_url"]
+
+    # Step 4: Update database with results (all URLs are from our storage),
+    # then clean up temp files in the same step
     await ctx.step.run(
         "update-database",
         update_sample_complete,
@@ -165,17 +193,11 @@ async def process_tiktok_video(ctx: inngest.Context) -> Dict[str, Any]:
                 "waveform": waveform_url
             },
             "analysis": audio_analysis,
-            "audio_metadata": audio_files.get("metadata", {})
+            "audio_metadata": audio_files.get("metadata", {}),
+            "temp_dir": video_metadata["temp_dir"]
         }
     )
 
-    # Step 9: Clean up temp files
-    await ctx.step.run(
-        "cleanup-temp-files",
-        cleanup_temp_files,
-        video_metadata["temp_dir"]
-    )
-
     return {
         "sample_id": sample_id,
         "status": "completed",
@@ -188,20 +210,19 @@ async def process_tiktok_video(ctx: inngest.Context) -> Dict[str, Any]:
 @inngest_client.create_function(
     fn_id="process-instagram-video",
     trigger=inngest.TriggerEvent(event="instagram/video.submitted"),
-    retries=3
+    retries=3,
+    # Cap in-flight videos across all workers; the stage semaphores bound work within a worker
+    concurrency=[inngest.Concurrency(limit=settings.PIPELINE_MAX_CONCURRENT_VIDEOS)]
 )
 async def process_instagram_video(ctx: inngest.Context) -> Dict[str, Any]:
     """
     Process an Instagram video through multiple steps:
-    1. Download video from Instagram
-    2. Upload video to our storage
-    3. Upload thumbnail to our storage
-    4. Extract audio (WAV and MP3)
-    5. Generate waveform visualization
-    6. Generate HLS stream
-    7. Analyze audio features (BPM, key detection)
-    8. Update database with results
-    9. Clean up temp files
+    1. Mark as processing and download video from Instagram
+    2. Upload video and thumbnail to our storage
+    3. Extract audio (WAV and MP3), then generate waveform, analyze audio features
+       and generate the HLS stream concurrently
+    4. Update database with results and clean up temp files
+    Steps 2 and 3 only depend on the download and run as parallel steps.
     """
     event_data = ctx.event.data
     sample_id = event_data.get("sample_id")
@@ -210,15 +231,7 @@ async def process_instagram_video(ctx: inngest.Context) -> Dict[str, Any]:
 
     logger.info(f"Processing Instagram video: {instagram_url} for sample: {sample_id}")
 
-    # Step 1: Update status to processing
-    await ctx.step.run(
-        "update-status-processing",
-        update_sample_status,
-        sample_id,
-        ProcessingStatus.PROCESSING
-    )
-
-    # Step 2: Download video and get metadata
+    # Step 1: Mark as processing, download video and get metadata
     video_metadata = await ctx.step.run(
         "download-instagram-video",
         download_instagram_video,
@@ -226,58 +239,36 @@ async def process_instagram_video(ctx: inngest.Context) -> Dict[str, Any]:
         sample_id
     )
 
-    # Step 3: Upload video file to our storage
-    video_url = await ctx.step.run(
-        "upload-video",
-        upload_video_to_storage,
-        video_metadata["video_path"],
-        sample_id
-    )
-
-    # Step 4: Upload thumbnail to our storage
-    media_urls = await ctx.step.run(
-        "upload-media",
-        upload_media_to_storage,
-        sample_id,
-        video_metadata.get("thumbnail_url"),
-        None  # Instagram doesn't have a separate cover URL
-    )
-
-    # Step 5: Extract audio (creates WAV and MP3, uploads to storage, returns URLs)
-    audio_files = await ctx.step.run(
-        "extract-audio",
-        extract_audio_from_video,
-        video_metadata["video_path"],
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 6: Generate waveform (generates PNG, uploads to storage, returns URL)
-    waveform_url = await ctx.step.run(
-        "generate-waveform",
-        generate_waveform,
-        audio_files["wav_path"],
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 7: Generate HLS stream (generates m3u8 + segments, uploads to storage, returns playlist URL)
-    hls_url = await ctx.step.run(
-        "generate-hls-stream",
-        generate_hls_stream,
-        audio_files["wav_path"],
-        video_metadata["temp_dir"],
-        sample_id
-    )
-
-    # Step 8: Analyze audio features (BPM, key detection)
-    audio_analysis = await ctx.step.run(
-        "analyze-audio-features",
-        analyze_audio_features,
-        audio_files["wav_path"]
-    )
-
-    # Step 9: Update database with results (all URLs are from our storage)
+    # Steps 2 and 3 only depend on the download, so they run as parallel steps - the
+    # network-bound uploads overlap with ffmpeg-bound audio processing.
+    # Step 2: Upload the video file and thumbnail to our storage
+    # Step 3: Extract audio (WAV and MP3), then generate the waveform, analyze audio
+    # features (BPM, key) and build the HLS stream concurrently - all from the local WAV.
+    # Every artifact is uploaded to storage as it's created.
+    media_urls, audio_files = await ctx.group.parallel((
+        lambda: ctx.step.run(
+            "upload-video-and-media",
+            upload_video_and_media,
+            video_metadata["video_path"],
+            sample_id,
+            video_metadata.get("thumbnail_url"),
+            None  # Instagram doesn't have a separate cover URL
+        ),
+        lambda: ctx.step.run(
+            "process-audio",
+            process_audio,
+            video_metadata["video_path"],
+            video_metadata["temp_dir"],
+            sample_id
+        ),
+    ))
+    video_url = media_urls["video"]
+    waveform_url = audio_files["waveform_url"]
+    audio_analysis = audio_files["analysis"]
+    hls_url = audio_files["hls_url"]
+
+    # Step 4: Update database with results (all URLs are from our storage),
+    # then clean up temp files in the same step
     await ctx.step.run(
         "update-database",
         update_instagram_sample_complete,
@@ -293,17 +284,11 @@ async def process_instagram_video(ctx: inngest.Context) -> Dict[str, Any]:
                 "waveform": waveform_url
             },
             "analysis": audio_analysis,
-            "audio_metadata": audio_files.get("metadata", {})
+            "audio_metadata": audio_files.get("metadata", {}),
+            "temp_dir": video_metadata["temp_dir"]
         }
     )
 
-    # Step 10: Clean up temp files
-    await ctx.step.run(
-        "cleanup-temp-files",
-        cleanup_temp_files,
-        video_metadata["temp_dir"]
-    )
-
     return {
         "sample_id": sample_id,
         "status": "completed",
@@ -320,18 +305,19 @@ async def update_sample_status(sample_id: str, status: ProcessingStatus) -> None
 
     for attempt in range(max_retries):
         try:
-            async with AsyncSessionLocal() as db:
-                # Convert sample_id to UUID if it's a string
-                if isinstance(sample_id, str):
-                    sample_uuid = uuid.UUID(sample_id)
-                else:
-                    sample_uuid = sample_id
-
-                query = select(Sample).where(Sample.id == sample_uuid)
-                result = await db.execute(query)
-                sample = result.scalars().first()
+            async with session_scope() as db:
+                sample_uuid = _as_uuid(sample_id)
+
+                # Single UPDATE round-trip - no need to load the row to change one column.
+                # A rowcount of 0 means the sample isn't visible yet (or doesn't exist).
+                result = await db.execute(
+                    update(Sample)
+                    .where(Sample.id == sample_uuid)
+                    .values(status=status)
+                    .execution_options(synchronize_session=False)
+                )
 
-                if not sample:
+                if result.rowcount == 0:
                     if attempt < max_retries - 1:
                         # Sample not found, but we have retries left - likely a visibility race condition
                         logger.warning(
@@ -353,8 +339,7 @@ async def update_sample_status(sample_id: str, status: ProcessingStatus) -> None
                             f"may have been deleted or database transaction not visible"
                         )
 
-                # Sample found - update status
-                sample.status = status
+                # Sample found - commit status update
                 await db.commit()
                 logger.info(f"Updated sample {sample_id} status to {status.value}")
                 return  # Success - exit retry loop
@@ -367,125 +352,233 @@ async def update_sample_status(sample_id: str, status: ProcessingStatus) -> None
             raise
 
 
+# Per-stage concurrency limits shared by every pipeline running in this worker.
+# Each stage applies backpressure independently, so one video's CPU-bound analysis
+# overlaps another's download/upload instead of every stage piling up at once.
+_DOWNLOAD_SEMAPHORE = asyncio.Semaphore(settings.PIPELINE_DOWNLOAD_CONCURRENCY)
+_AUDIO_SEMAPHORE = asyncio.Semaphore(settings.PIPELINE_AUDIO_CONCURRENCY)
+_ANALYSIS_SEMAPHORE = asyncio.Semaphore(settings.PIPELINE_ANALYSIS_CONCURRENCY)
+_UPLOAD_SEMAPHORE = asyncio.Semaphore(settings.PIPELINE_UPLOAD_CONCURRENCY)
+
+
+async def _bounded_upload(storage: S3Storage, file_path: str, object_key: str) -> str:
+    """Upload a file to storage, waiting for a free upload slot first"""
+    async with _UPLOAD_SEMAPHORE:
+        return await storage.upload_file(file_path, object_key)
+
+
+_TIKTOK_USERNAME_RE = re.compile(r"https?://[^/]+/@([^/?#]+)/")
+
+# Download metadata fields consumed by later steps. Step outputs are persisted
+# by Inngest and replayed into every following step, so the download steps
+# return only these instead of the downloaders' full API payloads.
+_TIKTOK_STEP_FIELDS = (
+    "video_path", "temp_dir", "file_size", "thumbnail_url", "origin_cover_url",
+    "tiktok_id", "aweme_id", "title", "description", "region", "duration", "upload_timestamp",
+    "creator_username", "creator_name", "tiktok_creator_id",
+    "view_count", "like_count", "comment_count", "share_count"
+)
+_INSTAGRAM_STEP_FIELDS = (
+    "video_path", "temp_dir", "file_size", "thumbnail_url",
+    "instagram_id", "instagram_shortcode", "title", "caption", "description", "duration", "taken_at",
+    "creator_username", "creator_full_name", "instagram_creator_id",
+    "view_count", "like_count", "comment_count"
+)
+
+
+def _step_metadata(metadata: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Project download metadata onto the fields later steps need"""
+    return {field: metadata[field] for field in fields if field in metadata}
+
+
 async def download_tiktok_video(url: str, sample_id: str) -> Dict[str, Any]:
     """Download TikTok video and extract metadata"""
-    # Use a persistent temp directory for this sample
-    temp_dir = Path(tempfile.gettempdir()) / f"sampletok_{sample_id}"
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    # The status update and creator lookup share one session (and pool checkout)
+    async with shared_session():
+        # Mark as processing here rather than in a separate step - saves a step
+        # checkpoint, and re-marking on a retried download is harmless
+        await update_sample_status(sample_id, ProcessingStatus.PROCESSING)
+
+        # Use a persistent temp directory for this sample
+        temp_dir = _processing_temp_root() / f"sampletok_{sample_id}"
+        temp_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        downloader = TikTokDownloader()
-        metadata = await downloader.download_video(url, str(temp_dir))
+        # The creator username is usually in the URL (tiktok.com/@user/video/...), so the
+        # creator lookup can run while the video downloads instead of after it
+        url_username = _parse_tiktok_username(url)
+        creator_task = asyncio.create_task(_get_tiktok_creator_id(url_username)) if url_username else None
 
-        # Fetch/update creator using creator service (with smart caching)
-        creator_username = metadata.get('creator_username')
-        if creator_username:
-            try:
-                logger.info(f"Getting or fetching creator for @{creator_username}")
-                async with AsyncSessionLocal() as db:
-                    creator_service = CreatorService(db)
-                    creator = await creator_service.get_or_fetch_creator(creator_username)
-
-                    if creator:
-                        # Store creator ID in metadata to link the sample
-                        metadata['tiktok_creator_id'] = str(creator.id)
-                        logger.info(f"Linked creator @{creator.username} ({creator.follower_count} followers)")
-                    else:
-                        logger.warning(f"Could not fetch creator info for @{creator_username}")
-            except Exception as e:
-                logger.exception(f"Failed to get/fetch creator @{creator_username}: {e}")
-                # Continue without creator link
+        try:
+            downloader = _get_tiktok_downloader()
+            async with _DOWNLOAD_SEMAPHORE:
+                metadata = await downloader.download_video(url, str(temp_dir))
+
+            # Fetch/update creator using creator service (with smart caching)
+            creator_username = metadata.get('creator_username')
+            creator_id = None
+            if creator_task is not None:
+                creator_id = await creator_task
+                creator_task = None
+                # The API's author is authoritative - discard the prefetch if the URL disagreed
+                if creator_username and url_username.lower() != creator_username.lower():
+                    logger.info(f"URL username @{url_username} differs from author @{creator_username}, refetching creator")
+                    creator_id = await _get_tiktok_creator_id(creator_username)
+            elif creator_username:
+                creator_id = await _get_tiktok_creator_id(creator_username)
+
+            if creator_id:
+                # Store creator ID in metadata to link the sample
+                metadata['tiktok_creator_id'] = creator_id
+
+            logger.info(f"Downloaded video: {metadata.get('aweme_id')} to {temp_dir}")
+            metadata['temp_dir'] = str(temp_dir)  # Pass temp_dir to next steps
+            return _step_metadata(metadata, _TIKTOK_STEP_FIELDS)
+        except Exception as e:
+            if creator_task is not None:
+                creator_task.cancel()
+                # The task shares this block's session - wait for it to unwind
+                # before shared_session() closes that session under it
+                await asyncio.gather(creator_task, return_exceptions=True)
+            # Clean up on error
+            import shutil
+            if temp_dir.exists():
+                shutil.rmtree(temp_dir)
+            raise
 
-        logger.info(f"Downloaded video: {metadata.get('aweme_id')} to {temp_dir}")
-        metadata['temp_dir'] = str(temp_dir)  # Pass temp_dir to next steps
-        return metadata
-    except Exception as e:
-        # Clean up on error
-        import shutil
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-        raise
 
+def _parse_tiktok_username(url: str) -> Optional[str]:
+    """Extract the @username from a full TikTok video URL (short links don't include it)"""
+    match = _TIKTOK_USERNAME_RE.match(url or "")
+    return match.group(1) if match else None
 
-async def download_instagram_video(shortcode: str, sample_id: str) -> Dict[str, Any]:
-    """Download Instagram video and extract metadata"""
-    # Use a persistent temp directory for this sample
-    temp_dir = Path(tempfile.gettempdir()) / f"sampletok_{sample_id}"
-    temp_dir.mkdir(parents=True, exist_ok=True)
+
+# In-process cache of creator key -> creator ID (TikTok username, or
+# "instagram:<id>" for Instagram). Viral creators show up in bursts of
+# submissions, and the pipeline only needs the ID to link the sample, so repeat
+# lookups within the TTL skip the creator service (and its DB query)
+_CREATOR_ID_CACHE_MAX_SIZE = 10_000
+_creator_id_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+
+def _get_cached_creator_id(username: str) -> Optional[str]:
+    """Return the cached creator ID for a username, if present and not expired"""
+    entry = _creator_id_cache.get(username)
+    if entry is None:
+        return None
+
+    expires_at, creator_id = entry
+    if expires_at < time.monotonic():
+        _creator_id_cache.pop(username, None)
+        return None
+    return creator_id
+
+
+def _cache_creator_id(username: str, creator_id: str) -> None:
+    """Cache a creator ID, evicting the oldest entries beyond the size limit"""
+    _creator_id_cache[username] = (time.monotonic() + settings.CREATOR_ID_CACHE_TTL_SECONDS, creator_id)
+    _creator_id_cache.move_to_end(username)
+    while len(_creator_id_cache) > _CREATOR_ID_CACHE_MAX_SIZE:
+        _creator_id_cache.popitem(last=False)
+
+
+async def _get_tiktok_creator_id(username: str) -> Optional[str]:
+    """Get or fetch a TikTok creator's ID in its own session; failures are logged, not raised"""
+    creator_id = _get_cached_creator_id(username)
+    if creator_id:
+        logger.info(f"Linked creator @{username} (cached)")
+        return creator_id
 
     try:
-        downloader = InstagramDownloader()
-        metadata = await downloader.download_video(shortcode, str(temp_dir))
+        logger.info(f"Getting or fetching creator for @{username}")
+        async with session_scope() as db:
+            creator_service = CreatorService(db)
+            creator = await creator_service.get_or_fetch_creator(username)
 
-        # Get or create Instagram creator using creator service (with smart caching)
-        # Instagram API returns creator data with the post, so we just need to cache it
-        if metadata.get('creator_instagram_id') and metadata.get('creator_username'):
-            try:
-                logger.info(f"Getting or creating Instagram creator @{metadata['creator_username']}")
-                async with AsyncSessionLocal() as db:
-                    instagram_creator_service = InstagramCreatorService(db)
-                    creator = await instagram_creator_service.get_or_create_creator(metadata)
-
-                    if creator:
-                        # Store creator ID in metadata to link the sample
-                        metadata['instagram_creator_id'] = str(creator.id)
-                        logger.info(f"Linked Instagram creator @{creator.username}")
-                    else:
-                        logger.warning(f"Could not create Instagram creator @{metadata['creator_username']}")
-            except Exception as e:
-                logger.exception(f"Failed to get/create Instagram creator: {e}")
-                # Continue without creator link
+            if not creator:
+                logger.warning(f"Could not fetch creator info for @{username}")
+                return None
 
-        logger.info(f"Downloaded Instagram video: {shortcode} to {temp_dir}")
-        metadata['temp_dir'] = str(temp_dir)  # Pass temp_dir to next steps
-        return metadata
+            logger.info(f"Linked creator @{creator.username} ({creator.follower_count} followers)")
+            creator_id = str(creator.id)
+            _cache_creator_id(username, creator_id)
+            return creator_id
     except Exception as e:
-        # Clean up on error
-        import shutil
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
-        raise
+        logger.exception(f"Failed to get/fetch creator @{username}: {e}")
+        # Continue without creator link
+        return None
 
 
-async def extract_audio_from_video(video_path: str, temp_dir: str, sample_id: str) -> Dict[str, Any]:
-    """Extract audio from video file, upload to storage, and return URLs"""
-    # Use the same temp directory from download step
-    processor = AudioProcessor()
-    audio_paths = await processor.extract_audio(video_path, temp_dir)
+async def download_instagram_video(shortcode: str, sample_id: str) -> Dict[str, Any]:
+    """Download Instagram video and extract metadata"""
+    # The status update and creator lookup share one session (and pool checkout)
+    async with shared_session():
+        # Mark as processing here rather than in a separate step - saves a step
+        # checkpoint, and re-marking on a retried download is harmless
+        await update_sample_status(sample_id, ProcessingStatus.PROCESSING)
+
+        # Use a persistent temp directory for this sample
+        temp_dir = _processing_temp_root() / f"sampletok_{sample_id}"
+        temp_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get audio metadata (duration, sample rate, etc.)
-    audio_metadata = await processor.get_audio_metadata(audio_paths["wav"])
+        try:
+            downloader = _get_instagram_downloader()
+            async with _DOWNLOAD_SEMAPHORE:
+                metadata = await downloader.download_video(shortcode, str(temp_dir))
+
+            # Get or create Instagram creator using creator service (with smart caching)
+            # Instagram API returns creator data with the post, so we just need to cache it
+            if metadata.get('creator_instagram_id') and metadata.get('creator_username'):
+                # Instagram IDs are numeric, so the prefixed key can't collide with a TikTok username
+                cache_key = f"instagram:{metadata['creator_instagram_id']}"
+                creator_id = _get_cached_creator_id(cache_key)
+                if creator_id:
+                    metadata['instagram_creator_id'] = creator_id
+                    logger.info(f"Linked Instagram creator @{metadata['creator_username']} (cached)")
+                else:
+                    try:
+                        logger.info(f"Getting or creating Instagram creator @{metadata['creator_username']}")
+                        async with session_scope() as db:
+                            instagram_creator_service = InstagramCreatorService(db)
+                            creator = await instagram_creator_service.get_or_create_creator(metadata)
+
+                            if creator:
+                                # Store creator ID in metadata to link the sample
+                                metadata['instagram_creator_id'] = str(creator.id)
+                                _cache_creator_id(cache_key, metadata['instagram_creator_id'])
+                                logger.info(f"Linked Instagram creator @{creator.username}")
+                            else:
+                                logger.warning(f"Could not create Instagram creator @{metadata['creator_username']}")
+                    except Exception as e:
+                        logger.exception(f"Failed to get/create Instagram creator: {e}")
+                        # Continue without creator link
 
-    logger.info(f"Extracted audio: WAV and MP3 created in {temp_dir}, duration={audio_metadata.get('duration'):.1f}s")
+            logger.info(f"Downloaded Instagram video: {shortcode} to {temp_dir}")
+            metadata['temp_dir'] = str(temp_dir)  # Pass temp_dir to next steps
+            return _step_metadata(metadata, _INSTAGRAM_STEP_FIELDS)
+        except Exception as e:
+            # Clean up on error
+            import shutil
+            if temp_dir.exists():
+                shutil.rmtree(temp_dir)
+            raise
 
-    # Upload files to R2 immediately to make this step idempotent
-    storage = S3Storage()
 
-    logger.info(f"Uploading audio files to R2 for sample {sample_id}")
-    wav_url = await storage.upload_file(
-        audio_paths["wav"],
-        f"samples/{sample_id}/audio.wav"
-    )
-    mp3_url = await storage.upload_file(
-        audio_paths["mp3"],
-        f"samples/{sample_id}/audio.mp3"
+async def _upload_audio_files(storage: S3Storage, audio_paths: Dict[str, str], sample_id: str) -> Tuple[str, str]:
+    """Upload the extracted WAV and MP3 files concurrently and return their URLs"""
+    wav_url, mp3_url = await asyncio.gather(
+        _bounded_upload(storage, audio_paths["wav"], f"samples/{sample_id}/audio.wav"),
+        _bounded_upload(storage, audio_paths["mp3"], f"samples/{sample_id}/audio.mp3")
     )
-    logger.info(f"Successfully uploaded audio files to R2: WAV and MP3")
-
-    return {
-        "wav_url": wav_url,
-        "mp3_url": mp3_url,
-        "wav_path": audio_paths["wav"],  # Keep for waveform/analysis in same step
-        "metadata": audio_metadata
-    }
+    return wav_url, mp3_url
 
 
 async def upload_video_to_storage(video_path: str, sample_id: str) -> str:
     """Upload video file to our storage and return URL"""
-    storage = S3Storage()
+    storage = _get_storage()
     logger.info(f"Uploading video to storage for sample {sample_id}")
 
-    video_url = await storage.upload_file(
+    video_url = await _bounded_upload(
+        storage,
         video_path,
         f"samples/{sample_id}/video.mp4"
     )
@@ -500,47 +593,65 @@ async def upload_media_to_storage(
     cover_url: Optional[str]
 ) -> Dict[str, Optional[str]]:
     """Download and upload thumbnail and cover images to our storage"""
-    storage = S3Storage()
-    media_urls = {}
-
-    # Upload thumbnail
-    if thumbnail_url:
-        logger.info(f"Downloading and uploading thumbnail for sample {sample_id}")
-        stored_url = await storage.download_and_upload_url(
-            thumbnail_url,
-            f"samples/{sample_id}/thumbnail.jpg",
-            "image/jpeg"
-        )
-        media_urls["thumbnail"] = stored_url
-        if stored_url:
-            logger.info(f"Successfully uploaded thumbnail")
-
-    # Upload cover image
-    if cover_url:
-        logger.info(f"Downloading and uploading cover image for sample {sample_id}")
-        stored_url = await storage.download_and_upload_url(
-            cover_url,
-            f"samples/{sample_id}/cover.jpg",
-            "image/jpeg"
-        )
-        media_urls["cover"] = stored_url
+    storage = _get_storage()
+
+    # The two images are independent CDN fetch + upload round trips, so run them
+    # together. download_and_upload_url returns None (rather than raising) on
+    # failure, so one bad image doesn't lose the other.
+    uploads = {
+        name: storage.download_and_upload_url(url, f"samples/{sample_id}/{name}.jpg", "image/jpeg")
+        for name, url in (("thumbnail", thumbnail_url), ("cover", cover_url))
+        if url
+    }
+    if not uploads:
+        # Some API responses carry no image URLs at all - nothing to fetch
+        return {}
+
+    logger.info(f"Downloading and uploading {', '.join(uploads)} for sample {sample_id}")
+    media_urls = dict(zip(uploads, await asyncio.gather(*uploads.values())))
+
+    for name, stored_url in media_urls.items():
         if stored_url:
-            logger.info(f"Successfully uploaded cover image")
+            logger.info(f"Successfully uploaded {name} image")
 
     return media_urls
 
 
-async def generate_waveform(audio_path: str, temp_dir: str, sample_id: str) -> str:
+async def upload_video_and_media(
+    video_path: str,
+    sample_id: str,
+    thumbnail_url: Optional[str],
+    cover_url: Optional[str]
+) -> Dict[str, Optional[str]]:
+    """
+    Upload the video file and thumbnail/cover images in one step.
+    Both are plain uploads, so sharing a step saves a checkpoint round-trip;
+    a retry just overwrites the same objects.
+    Returns {"video": ..., "thumbnail": ..., "cover": ...}
+    """
+    if not (thumbnail_url or cover_url):
+        return {"video": await upload_video_to_storage(video_path, sample_id)}
+
+    video_url, media_urls = await asyncio.gather(
+        upload_video_to_storage(video_path, sample_id),
+        upload_media_to_storage(sample_id, thumbnail_url, cover_url)
+    )
+    return {"video": video_url, **media_urls}
+
+
+async def generate_waveform(audio_path: str, temp_dir: str, sample_id: str, samples: Any = None) -> str:
     """Generate waveform visualization, upload to storage, and return URL"""
     # Use the same temp directory
-    processor = AudioProcessor()
-    waveform_path = await processor.generate_waveform(audio_path, temp_dir)
+    processor = _get_processor()
+    async with _AUDIO_SEMAPHORE:
+        waveform_path = await processor.generate_waveform(audio_path, temp_dir, samples)
     logger.info(f"Generated waveform visualization in {temp_dir}")
 
     # Upload to R2 immediately
-    storage = S3Storage()
+    storage = _get_storage()
     logger.info(f"Uploading waveform to R2 for sample {sample_id}")
-    waveform_url = await storage.upload_file(
+    waveform_url = await _bounded_upload(
+        storage,
         waveform_path,
         f"samples/{sample_id}/waveform.png"
     )
@@ -560,37 +671,29 @@ async def generate_waveform(audio_path: str, temp_dir: str, sample_id: str) -> s
 async def generate_hls_stream(audio_path: str, temp_dir: str, sample_id: str) -> str:
     """Generate HLS stream, upload playlist and segments to storage, and return playlist URL"""
     # Use the same temp directory
-    processor = AudioProcessor()
-    hls_data = await processor.generate_hls_stream(audio_path, temp_dir)
+    processor = _get_processor()
+    async with _AUDIO_SEMAPHORE:
+        hls_data = await processor.generate_hls_stream(audio_path, temp_dir)
     logger.info(f"Generated HLS stream: {len(hls_data['segments'])} segments")
 
     # Upload to R2 immediately
-    storage = S3Storage()
-
-    # Upload playlist file
-    logger.info(f"Uploading HLS playlist to R2 for sample {sample_id}")
-    playlist_url = await storage.upload_file(
-        hls_data['playlist'],
-        f"samples/{sample_id}/hls/playlist.m3u8"
-    )
-    logger.info(f"Successfully uploaded HLS playlist to R2")
-
-    # Upload all segment files
-    logger.info(f"Uploading {len(hls_data['segments'])} HLS segments to R2")
-    for i, segment_path in enumerate(hls_data['segments']):
-        segment_filename = Path(segment_path).name
-        await storage.upload_file(
-            segment_path,
-            f"samples/{sample_id}/hls/{segment_filename}"
+    storage = _get_storage()
+
+    # Upload playlist and all segment files concurrently
+    logger.info(f"Uploading HLS playlist and {len(hls_data['segments'])} segments to R2 for sample {sample_id}")
+    playlist_url, *_ = await asyncio.gather(
+        _bounded_upload(storage, hls_data['playlist'], f"samples/{sample_id}/hls/playlist.m3u8"),
+        *(
+            _bounded_upload(storage, segment_path, f"samples/{sample_id}/hls/{Path(segment_path).name}")
+            for segment_path in hls_data['segments']
         )
-        logger.info(f"Uploaded HLS segment {i+1}/{len(hls_data['segments'])}")
+    )
 
-    logger.info(f"Successfully uploaded all HLS segments to R2")
+    logger.info(f"Successfully uploaded HLS playlist and all segments to R2")
 
     # Clean up HLS directory
-    import shutil
     try:
-        shutil.rmtree(hls_data['hls_dir'])
+        await asyncio.to_thread(_remove_temp_dir, hls_data['hls_dir'])
         logger.info(f"Cleaned up local HLS directory")
     except Exception as e:
         logger.warning(f"Failed to clean up HLS directory: {e}")
@@ -598,14 +701,19 @@ async def generate_hls_stream(audio_path: str, temp_dir: str, sample_id: str) ->
     return playlist_url
 
 
-async def analyze_audio_features(audio_path: str) -> Dict[str, Any]:
+async def analyze_audio_features(audio_path: str, shared_audio: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Analyze audio file to extract musical features
     Returns dict with BPM, key, scale, and confidence scores
+    Uses the shared-memory decode of the file when one is provided.
     """
     try:
-        analyzer = AudioAnalyzer()
-        analysis = await analyzer.analyze_audio(audio_path)
+        analyzer = _get_analyzer()
+        async with _ANALYSIS_SEMAPHORE:
+            if shared_audio is not None:
+                analysis = await analyzer.analyze_shared_audio(shared_audio)
+            else:
+                analysis = await analyzer.analyze_audio(audio_path)
         logger.info(f"Audio analysis complete: BPM={analysis.get('bpm')}, Key={analysis.get('key')} {analysis.get('scale')}")
         return analysis
     except Exception as e:
@@ -619,23 +727,143 @@ async def analyze_audio_features(audio_path: str) -> Dict[str, Any]:
         }
 
 
+async def generate_waveform_and_analysis(audio_path: str, temp_dir: str, sample_id: str) -> Dict[str, Any]:
+    """
+    Generate the waveform and analyze audio features concurrently.
+    The WAV is decoded once into shared memory and both consumers read that
+    buffer - the waveform in-process, the analysis from a pool worker.
+    """
+    try:
+        shm, samples, descriptor = await asyncio.to_thread(decode_to_shared_memory, audio_path)
+    except Exception as e:
+        # Fall back to each side reading the file itself
+        logger.warning(f"Could not decode {audio_path} into shared memory: {e}")
+        waveform_url, analysis = await asyncio.gather(
+            generate_waveform(audio_path, temp_dir, sample_id),
+            analyze_audio_features(audio_path)
+        )
+    else:
+        try:
+            waveform_url, analysis = await asyncio.gather(
+                generate_waveform(audio_path, temp_dir, sample_id, samples),
+                analyze_audio_features(audio_path, descriptor)
+            )
+        finally:
+            # Views must be dropped before the buffer can be closed
+            del samples
+            release_shared_audio(shm)
+
+    return {
+        "waveform_url": waveform_url,
+        "analysis": analysis
+    }
+
+
+async def process_audio(video_path: str, temp_dir: str, sample_id: str) -> Dict[str, Any]:
+    """
+    Extract audio, then upload it and generate the waveform, analysis and HLS stream in one step.
+    Everything here works off the local WAV, so running it as a single step saves
+    the checkpoint round-trips between them. Each stage uploads its own output,
+    so a retried step just overwrites the same objects.
+    """
+    # Use the same temp directory from download step
+    processor = _get_processor()
+    async with _AUDIO_SEMAPHORE:
+        audio_paths = await processor.extract_audio(video_path, temp_dir)
+    wav_path = audio_paths["wav"]
+
+    # Nothing downstream depends on the WAV/MP3 uploads, so they run alongside
+    # probing, waveform/analysis and HLS generation - only the waveform upload
+    # waits for the waveform. The local WAV stays on disk regardless of upload state.
+    logger.info(f"Uploading audio files to R2 for sample {sample_id}")
+    (wav_url, mp3_url), audio_metadata, waveform_and_analysis, hls_url = await asyncio.gather(
+        _upload_audio_files(_get_storage(), audio_paths, sample_id),
+        # Get audio metadata (duration, sample rate, etc.)
+        processor.get_audio_metadata(wav_path),
+        generate_waveform_and_analysis(wav_path, temp_dir, sample_id),
+        generate_hls_stream(wav_path, temp_dir, sample_id)
+    )
+    logger.info(f"Processed audio for sample {sample_id}: duration={audio_metadata.get('duration'):.1f}s, WAV and MP3 uploaded")
+
+    # Step output is persisted as JSON - only return what later steps read
+    return {
+        "wav_url": wav_url,
+        "mp3_url": mp3_url,
+        "metadata": {"duration": audio_metadata.get("duration")},
+        "waveform_url": waveform_and_analysis["waveform_url"],
+        "analysis": waveform_and_analysis["analysis"],
+        "hls_url": hls_url
+    }
+
+
 # upload_to_storage function removed - files are now uploaded immediately after creation
 # This makes the pipeline idempotent and resilient to step retries
 
 
-def cleanup_temp_files(temp_dir: str) -> None:
-    """Clean up temporary files after processing"""
-    import shutil
+# Background cleanup tasks - held here so they aren't garbage collected mid-run
+_cleanup_tasks: Set[asyncio.Task] = set()
+
+
+async def cleanup_temp_files(temp_dir: str) -> None:
+    """
+    Clean up temporary files after processing.
+    Nothing waits on the removal, so it runs in the background and the step
+    completes (and the run finishes) without blocking on filesystem work.
+    """
+    task = asyncio.create_task(_remove_temp_files(temp_dir))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+async def _remove_temp_files(temp_dir: str) -> None:
+    """Remove a sample's temp directory, logging (not raising) failures"""
     try:
-        temp_path = Path(temp_dir)
-        if temp_path.exists():
-            shutil.rmtree(temp_path)
+        # Step handlers run on the event loop, so do the filesystem work in a thread
+        if await asyncio.to_thread(os.path.isdir, temp_dir):
+            await asyncio.to_thread(_remove_temp_dir, temp_dir)
             logger.info(f"Cleaned up temp files at {temp_dir}")
     except Exception as e:
         logger.warning(f"Failed to clean up temp files: {e}")
         # Don't fail the whole process if cleanup fails
 
 
+def _processing_temp_root() -> Path:
+    """Root directory for per-sample scratch files (PROCESSING_TEMP_DIR, e.g. a tmpfs, or the system temp dir)"""
+    return Path(settings.PROCESSING_TEMP_DIR or tempfile.gettempdir())
+
+
+def _remove_temp_dir(path: str) -> None:
+    """
+    Remove a processing temp directory.
+    Our temp dirs hold a handful of flat files (plus the HLS subdirectory), so a
+    scandir/unlink pass avoids the per-entry stat calls shutil.rmtree makes.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _remove_temp_dir(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+# Download metadata copied straight onto Sample columns of the same name
+_TIKTOK_META_FIELDS = (
+    "aweme_id", "region", "creator_username", "creator_name", "description", "upload_timestamp",
+)
+_META_COUNT_FIELDS = ("view_count", "like_count", "comment_count", "share_count")
+# Storage URL keys -> Sample columns
+_URL_COLUMNS = MappingProxyType({
+    "video": "video_url",
+    "thumbnail": "thumbnail_url",
+    "cover": "cover_url",
+    "wav": "audio_url_wav",
+    "mp3": "audio_url_mp3",
+    "hls": "audio_url_hls",
+    "waveform": "waveform_url",
+})
+
+
 async def update_sample_complete(data: Dict[str, Any]) -> None:
     """Update sample with processing results (with retry logic for race conditions)"""
     sample_id = data["sample_id"]
@@ -644,37 +872,86 @@ async def update_sample_complete(data: Dict[str, Any]) -> None:
     analysis = data.get("analysis", {})
     audio_metadata = data.get("audio_metadata", {})
 
-    # Convert sample_id to UUID if it's a string
-    if isinstance(sample_id, str):
-        sample_uuid = uuid.UUID(sample_id)
-    else:
-        sample_uuid = sample_id
+    sample_uuid = _as_uuid(sample_id)
+
+    # Build the column values up front - the whole result is written with a
+    # single UPDATE instead of SELECT + attribute mutation + flush
+    values = {field: metadata.get(field) for field in _TIKTOK_META_FIELDS}
+    values.update({field: metadata.get(field, 0) for field in _META_COUNT_FIELDS})
+    # Update file URLs - All from our storage (R2/S3/GCS)
+    values.update({column: urls.get(key) for key, column in _URL_COLUMNS.items()})
+    # Clean title by removing hashtags
+    values["title"] = remove_hashtags(metadata.get("title") or "")
+    # Use duration from audio metadata (extracted from actual audio file)
+    values["duration_seconds"] = audio_metadata.get("duration", metadata.get("duration"))
+    # Mark as completed
+    values["status"] = ProcessingStatus.COMPLETED
+
+    # Only set tiktok_id if it's not already set (avoid unique constraint errors during reprocessing)
+    if metadata.get("tiktok_id"):
+        values["tiktok_id"] = func.coalesce(Sample.tiktok_id, metadata["tiktok_id"])
+
+    # Extract hashtags from description and title
+    hashtags = extract_hashtags(metadata.get("title"), metadata.get("description"))
+    if hashtags:
+        values["tags"] = hashtags
+        logger.info(f"Extracted {len(hashtags)} hashtags: {hashtags}")
+
+    # Update audio analysis results
+    if analysis.get("bpm"):
+        values["bpm"] = analysis["bpm"]
+        logger.info(f"Set BPM: {analysis['bpm']}")
+
+    if analysis.get("key") and analysis.get("scale"):
+        values["key"] = f"{analysis['key']} {analysis['scale']}"
+        logger.info(f"Set key: {values['key']}")
+
+    # Calculate video file size if available
+    if metadata.get("file_size"):
+        values["file_size_video"] = metadata["file_size"]
+
+    # Link to TikTok creator if available
+    tiktok_creator_id = metadata.get("tiktok_creator_id")
+    if tiktok_creator_id:
+        values["tiktok_creator_id"] = uuid.UUID(tiktok_creator_id)
+        logger.info(f"Linked sample to creator {tiktok_creator_id}")
 
     max_retries = 3
     retry_delay = 0.5
-    sample = None
 
     # Retry loop to handle race conditions
     for attempt in range(max_retries):
         try:
             async with AsyncSessionLocal() as db:
-                logger.info(f"Looking for sample with ID: {sample_uuid} (attempt {attempt + 1}/{max_retries})")
-                query = select(Sample).where(Sample.id == sample_uuid)
-                result = await db.execute(query)
-                sample = result.scalars().first()
+                logger.info(f"Updating sample with ID: {sample_uuid} (attempt {attempt + 1}/{max_retries})")
+                result = await db.execute(
+                    update(Sample)
+                    .where(Sample.id == sample_uuid)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
 
-                if not sample:
+                if result.rowcount == 0:
                     # Try to find by aweme_id as fallback
                     aweme_id = metadata.get('aweme_id')
                     if aweme_id:
                         logger.info(f"Sample not found by ID, trying aweme_id: {aweme_id}")
-                        query = select(Sample).where(Sample.aweme_id == aweme_id)
-                        result = await db.execute(query)
-                        sample = result.scalars().first()
-                        if sample:
-                            logger.info(f"Found sample by aweme_id: {sample.id}")
+                        result = await db.execute(
+                            update(Sample)
+                            .where(Sample.aweme_id == aweme_id)
+                            .values(**values)
+                            .returning(Sample.id)
+                            .execution_options(synchronize_session=False)
+                        )
+                        matched_id = result.scalar_one_or_none()
+                        if matched_id:
+                            logger.info(f"Found sample by aweme_id: {matched_id}")
+                    else:
+                        matched_id = None
+                else:
+                    matched_id = sample_uuid
 
-                if not sample:
+                if not matched_id:
                     if attempt < max_retries - 1:
                         # Sample not found, but we have retries left
                         logger.warning(
@@ -695,69 +972,13 @@ async def update_sample_complete(data: Dict[str, Any]) -> None:
                             f"may have been deleted or database transaction not visible"
                         )
 
-                # Sample found - update metadata from TikTok API
-                # Only set tiktok_id if it's not already set (avoid unique constraint errors during reprocessing)
-                if not sample.tiktok_id and metadata.get("tiktok_id"):
-                    sample.tiktok_id = metadata.get("tiktok_id")
-                sample.aweme_id = metadata.get("aweme_id")
-                # Clean title by removing hashtags
-                raw_title = metadata.get("title") or ""
-                sample.title = remove_hashtags(raw_title)
-                sample.region = metadata.get("region")
-                sample.creator_username = metadata.get("creator_username")
-                sample.creator_name = metadata.get("creator_name")
-                sample.description = metadata.get("description")
-                sample.view_count = metadata.get("view_count", 0)
-                sample.like_count = metadata.get("like_count", 0)
-                sample.comment_count = metadata.get("comment_count", 0)
-                sample.share_count = metadata.get("share_count", 0)
-                sample.upload_timestamp = metadata.get("upload_timestamp")
-
-                # Extract hashtags from description and title
-                description_text = metadata.get("description", "")
-                title_text = metadata.get("title", "")
-                combined_text = f"{title_text} {description_text}"
-                hashtags = extract_hashtags(combined_text)
-                if hashtags:
-                    sample.tags = hashtags
-                    logger.info(f"Extracted {len(hashtags)} hashtags: {hashtags}")
-
-                # Use duration from audio metadata (extracted from actual audio file)
-                sample.duration_seconds = audio_metadata.get("duration", metadata.get("duration"))
-
-                # Update audio analysis results
-                if analysis.get("bpm"):
-                    sample.bpm = analysis["bpm"]
-                    logger.info(f"Set BPM: {analysis['bpm']}")
-
-                if analysis.get("key") and analysis.get("scale"):
-                    sample.key = f"{analysis['key']} {analysis['scale']}"
-                    logger.info(f"Set key: {sample.key}")
-
-                # Update file URLs - All from our storage (R2/S3/GCS)
-                sample.video_url = urls.get("video")
-                sample.thumbnail_url = urls.get("thumbnail")
-                sample.cover_url = urls.get("cover")
-                sample.audio_url_wav = urls["wav"]
-                sample.audio_url_mp3 = urls["mp3"]
-                sample.audio_url_hls = urls.get("hls")
-                sample.waveform_url = urls["waveform"]
-
-                # Calculate video file size if available
-                if metadata.get("file_size"):
-                    sample.file_size_video = metadata["file_size"]
-
-                # Link to TikTok creator if available
-                tiktok_creator_id = metadata.get("tiktok_creator_id")
-                if tiktok_creator_id:
-                    sample.tiktok_creator_id = uuid.UUID(tiktok_creator_id)
-                    logger.info(f"Linked sample to creator {tiktok_creator_id}")
-
-                # Mark as completed
-                sample.status = ProcessingStatus.COMPLETED
-
                 await db.commit()
                 logger.info(f"Sample {sample_id} processing completed successfully")
+
+                # Temp files are only needed until the results are saved; cleaning up
+                # here rather than in its own step saves a step checkpoint
+                if data.get("temp_dir"):
+                    await cleanup_temp_files(data["temp_dir"])
                 return  # Success - exit retry loop
 
         except ValueError:
@@ -776,43 +997,120 @@ async def update_instagram_sample_complete(data: Dict[str, Any]) -> None:
     analysis = data.get("analysis", {})
     audio_metadata = data.get("audio_metadata", {})
 
-    # Convert sample_id to UUID if it's a string
-    if isinstance(sample_id, str):
-        sample_uuid = uuid.UUID(sample_id)
-    else:
-        sample_uuid = sample_id
+    sample_uuid = _as_uuid(sample_id)
+
+    # Build the column values up front - the whole result is written with a
+    # single UPDATE instead of SELECT + attribute mutation + flush
+    description = metadata.get("caption") or metadata.get("description", "")
+    values = {
+        # Set Instagram-specific fields
+        "title": metadata.get("title"),
+        "creator_username": metadata.get("creator_username"),
+        "creator_name": metadata.get("creator_full_name"),
+        "description": description,
+        "view_count": metadata.get("view_count", 0),
+        "like_count": metadata.get("like_count", 0),
+        "comment_count": metadata.get("comment_count", 0),
+        "share_count": 0,  # Instagram doesn't provide share count in this API
+        "region": None,  # Instagram doesn't provide region data
+        # Use duration from audio metadata (extracted from actual audio file)
+        "duration_seconds": audio_metadata.get("duration", metadata.get("duration")),
+        # Update file URLs - All from our storage (R2/S3/GCS)
+        "video_url": urls.get("video"),
+        "thumbnail_url": urls.get("thumbnail"),
+        "cover_url": urls.get("thumbnail"),  # Instagram uses same for both
+        "audio_url_wav": urls["wav"],
+        "audio_url_mp3": urls["mp3"],
+        "audio_url_hls": urls.get("hls"),
+        "waveform_url": urls["waveform"],
+        # Mark as completed
+        "status": ProcessingStatus.COMPLETED
+    }
+
+    # Only set instagram_id/shortcode if not already set (avoid unique constraint errors during reprocessing)
+    if metadata.get("instagram_id"):
+        values["instagram_id"] = func.coalesce(Sample.instagram_id, metadata["instagram_id"])
+    if metadata.get("instagram_shortcode"):
+        values["instagram_shortcode"] = func.coalesce(Sample.instagram_shortcode, metadata["instagram_shortcode"])
+
+    # Convert Instagram taken_at to upload_timestamp
+    taken_at = metadata.get("taken_at")
+    if taken_at:
+        values["upload_timestamp"] = taken_at
+
+    # Extract hashtags from both title and caption/description
+    hashtags = extract_hashtags(metadata.get("title"), description)
+    if hashtags:
+        values["tags"] = hashtags
+        logger.info(f"Extracted {len(hashtags)} hashtags: {hashtags}")
+
+    # Update audio analysis results
+    if analysis.get("bpm"):
+        values["bpm"] = analysis["bpm"]
+        logger.info(f"Set BPM: {analysis['bpm']}")
+
+    if analysis.get("key") and analysis.get("scale"):
+        values["key"] = f"{analysis['key']} {analysis['scale']}"
+        logger.info(f"Set key: {values['key']}")
+
+    # Calculate video file size if available
+    if metadata.get("file_size"):
+        values["file_size_video"] = metadata["file_size"]
+
+    # Link to Instagram creator if available
+    instagram_creator_id = metadata.get("instagram_creator_id")
+    if instagram_creator_id:
+        values["instagram_creator_id"] = uuid.UUID(instagram_creator_id)
+        logger.info(f"Linked sample to Instagram creator {instagram_creator_id}")
 
     max_retries = 3
     retry_delay = 0.5
-    sample = None
 
     # Retry loop to handle race conditions
     for attempt in range(max_retries):
         try:
             async with AsyncSessionLocal() as db:
-                logger.info(f"Looking for Instagram sample with ID: {sample_uuid} (attempt {attempt + 1}/{max_retries})")
-                query = select(Sample).where(Sample.id == sample_uuid)
-                result = await db.execute(query)
-                sample = result.scalars().first()
+                logger.info(f"Updating Instagram sample with ID: {sample_uuid} (attempt {attempt + 1}/{max_retries})")
+                result = await db.execute(
+                    update(Sample)
+                    .where(Sample.id == sample_uuid)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
 
-                if not sample:
+                if result.rowcount == 0:
                     # Try to find by instagram_id or shortcode as fallback
                     instagram_id = metadata.get('instagram_id')
                     instagram_shortcode = metadata.get('instagram_shortcode')
                     if instagram_id or instagram_shortcode:
                         logger.info(f"Sample not found by ID, trying instagram_id: {instagram_id} or shortcode: {instagram_shortcode}")
-                        query = select(Sample).where(
-                            or_(
-                                Sample.instagram_id == instagram_id if instagram_id else False,
-                                Sample.instagram_shortcode == instagram_shortcode if instagram_shortcode else False
+                        fallback_id = (
+                            select(Sample.id)
+                            .where(
+                                or_(
+                                    Sample.instagram_id == instagram_id if instagram_id else False,
+                                    Sample.instagram_shortcode == instagram_shortcode if instagram_shortcode else False
+                                )
                             )
+                            .limit(1)
+                            .scalar_subquery()
                         )
-                        result = await db.execute(query)
-                        sample = result.scalars().first()
-                        if sample:
-                            logger.info(f"Found sample by instagram metadata: {sample.id}")
+                        result = await db.execute(
+                            update(Sample)
+                            .where(Sample.id == fallback_id)
+                            .values(**values)
+                            .returning(Sample.id)
+                            .execution_options(synchronize_session=False)
+                        )
+                        matched_id = result.scalar_one_or_none()
+                        if matched_id:
+                            logger.info(f"Found sample by instagram metadata: {matched_id}")
+                    else:
+                        matched_id = None
+                else:
+                    matched_id = sample_uuid
 
-                if not sample:
+                if not matched_id:
                     if attempt < max_retries - 1:
                         # Sample not found, but we have retries left
                         logger.warning(
@@ -833,74 +1131,13 @@ async def update_instagram_sample_complete(data: Dict[str, Any]) -> None:
                             f"may have been deleted or database transaction not visible"
                         )
 
-                # Sample found - update metadata from Instagram API
-                # Only set instagram_id if it's not already set (avoid unique constraint errors during reprocessing)
-                if not sample.instagram_id and metadata.get("instagram_id"):
-                    sample.instagram_id = metadata.get("instagram_id")
-                if not sample.instagram_shortcode and metadata.get("instagram_shortcode"):
-                    sample.instagram_shortcode = metadata.get("instagram_shortcode")
-
-                # Set Instagram-specific fields
-                sample.title = metadata.get("title")
-                sample.creator_username = metadata.get("creator_username")
-                sample.creator_name = metadata.get("creator_full_name")
-                sample.description = metadata.get("caption") or metadata.get("description", "")
-                sample.view_count = metadata.get("view_count", 0)
-                sample.like_count = metadata.get("like_count", 0)
-                sample.comment_count = metadata.get("comment_count", 0)
-                sample.share_count = 0  # Instagram doesn't provide share count in this API
-                sample.region = None  # Instagram doesn't provide region data
-
-                # Convert Instagram taken_at to upload_timestamp
-                taken_at = metadata.get("taken_at")
-                if taken_at:
-                    sample.upload_timestamp = taken_at
-
-                # Extract hashtags from both title and caption/description
-                title_text = metadata.get("title", "")
-                description_text = metadata.get("caption") or metadata.get("description", "")
-                combined_text = f"{title_text} {description_text}"
-                hashtags = extract_hashtags(combined_text)
-                if hashtags:
-                    sample.tags = hashtags
-                    logger.info(f"Extracted {len(hashtags)} hashtags: {hashtags}")
-
-                # Use duration from audio metadata (extracted from actual audio file)
-                sample.duration_seconds = audio_metadata.get("duration", metadata.get("duration"))
-
-                # Update audio analysis results
-                if analysis.get("bpm"):
-                    sample.bpm = analysis["bpm"]
-                    logger.info(f"Set BPM: {analysis['bpm']}")
-
-                if analysis.get("key") and analysis.get("scale"):
-                    sample.key = f"{analysis['key']} {analysis['scale']}"
-                    logger.info(f"Set key: {sample.key}")
-
-                # Update file URLs - All from our storage (R2/S3/GCS)
-                sample.video_url = urls.get("video")
-                sample.thumbnail_url = urls.get("thumbnail")
-                sample.cover_url = urls.get("thumbnail")  # Instagram uses same for both
-                sample.audio_url_wav = urls["wav"]
-                sample.audio_url_mp3 = urls["mp3"]
-                sample.audio_url_hls = urls.get("hls")
-                sample.waveform_url = urls["waveform"]
-
-                # Calculate video file size if available
-                if metadata.get("file_size"):
-                    sample.file_size_video = metadata["file_size"]
-
-                # Link to Instagram creator if available
-                instagram_creator_id = metadata.get("instagram_creator_id")
-                if instagram_creator_id:
-                    sample.instagram_creator_id = uuid.UUID(instagram_creator_id)
-                    logger.info(f"Linked sample to Instagram creator {instagram_creator_id}")
-
-                # Mark as completed
-                sample.status = ProcessingStatus.COMPLETED
-
                 await db.commit()
                 logger.info(f"Instagram sample {sample_id} processing completed successfully")
+
+                # Temp files are only needed until the results are saved; cleaning up
+                # here rather than in its own step saves a step checkpoint
+                if data.get("temp_dir"):
+                    await cleanup_temp_files(data["temp_dir"])
                 return  # Success - exit retry loop
 
         except ValueError:
@@ -911,6 +1148,52 @@ async def update_instagram_sample_complete(data: Dict[str, Any]) -> None:
             raise
 
 
+async def mark_sample_failed(sample_id: str, error_message: str, label: str = "Sample") -> None:
+    """
+    Mark a sample as failed (with retry logic for race conditions)
+    `label` prefixes log messages, e.g. "Instagram sample"
+    """
+    sample_uuid = _as_uuid(sample_id)
+    max_retries = 3
+    retry_delay = 0.5
+
+    for attempt in range(max_retries):
+        try:
+            async with AsyncSessionLocal() as db:
+                logger.info(f"Marking {label.lower()} {sample_uuid} as failed (attempt {attempt + 1}/{max_retries})")
+                result = await db.execute(
+                    update(Sample)
+                    .where(Sample.id == sample_uuid)
+                    .values(status=ProcessingStatus.FAILED, error_message=error_message)
+                    .execution_options(synchronize_session=False)
+                )
+
+                if result.rowcount == 0:
+                    if attempt < max_retries - 1:
+                        logger.warning(
+                            f"{label} {sample_uuid} not found in error handler (attempt {attempt + 1}/{max_retries}). "
+                            f"Retrying in {retry_delay}s..."
+                        )
+                        await asyncio.sleep(retry_delay)
+                        retry_delay *= 2
+                        continue
+                    else:
+                        logger.error(
+                            f"{label} {sample_uuid} not found after {max_retries} attempts in error handler. "
+                            f"Cannot mark as failed."
+                        )
+                        return  # Give up gracefully
+
+                await db.commit()
+                logger.error(f"{label} {sample_id} processing failed: {error_message}")
+                return  # Success
+
+        except Exception as e:
+            logger.exception(f"Error in error handler for {label.lower()} {sample_id}: {e}")
+            if attempt == max_retries - 1:
+                raise
+
+
 # Error handler function
 @inngest_client.create_function(
     fn_id="handle-processing-error",
@@ -922,48 +1205,7 @@ async def handle_processing_error(ctx: inngest.Context) -> None:
     sample_id = event_data.get("sample_id")
     error_message = event_data.get("error", "Unknown error occurred")
 
-    async def update_failed_status():
-        sample_uuid = uuid.UUID(sample_id)
-        max_retries = 3
-        retry_delay = 0.5
-
-        for attempt in range(max_retries):
-            try:
-                async with AsyncSessionLocal() as db:
-                    logger.info(f"Marking sample {sample_uuid} as failed (attempt {attempt + 1}/{max_retries})")
-                    query = select(Sample).where(Sample.id == sample_uuid)
-                    result = await db.execute(query)
-                    sample = result.scalars().first()
-
-                    if not sample:
-                        if attempt < max_retries - 1:
-                            logger.warning(
-                                f"Sample {sample_uuid} not found in error handler (attempt {attempt + 1}/{max_retries}). "
-                                f"Retrying in {retry_delay}s..."
-                            )
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 2
-                            continue
-                        else:
-                            logger.error(
-                                f"Sample {sample_uuid} not found after {max_retries} attempts in error handler. "
-                                f"Cannot mark as failed."
-                            )
-                            return  # Give up gracefully
-
-                    sample.status = ProcessingStatus.FAILED
-                    sample.error_message = error_message
-
-                    await db.commit()
-                    logger.error(f"Sample {sample_id} processing failed: {error_message}")
-                    return  # Success
-
-            except Exception as e:
-                logger.exception(f"Error in error handler for sample {sample_id}: {e}")
-                if attempt == max_retries - 1:
-                    raise
-
-    await ctx.step.run("mark-as-failed", update_failed_status)
+    await ctx.step.run("mark-as-failed", mark_sample_failed, sample_id, error_message)
 
 
 # Instagram error handler function
@@ -977,48 +1219,7 @@ async def handle_instagram_processing_error(ctx: inngest.Context) -> None:
     sample_id = event_data.get("sample_id")
     error_message = event_data.get("error", "Unknown error occurred")
 
-    async def update_failed_status():
-        sample_uuid = uuid.UUID(sample_id)
-        max_retries = 3
-        retry_delay = 0.5
-
-        for attempt in range(max_retries):
-            try:
-                async with AsyncSessionLocal() as db:
-                    logger.info(f"Marking Instagram sample {sample_uuid} as failed (attempt {attempt + 1}/{max_retries})")
-                    query = select(Sample).where(Sample.id == sample_uuid)
-                    result = await db.execute(query)
-                    sample = result.scalars().first()
-
-                    if not sample:
-                        if attempt < max_retries - 1:
-                            logger.warning(
-                                f"Instagram sample {sample_uuid} not found in error handler (attempt {attempt + 1}/{max_retries}). "
-                                f"Retrying in {retry_delay}s..."
-                            )
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 2
-                            continue
-                        else:
-                            logger.error(
-                                f"Instagram sample {sample_uuid} not found after {max_retries} attempts in error handler. "
-                                f"Cannot mark as failed."
-                            )
-                            return  # Give up gracefully
-
-                    sample.status = ProcessingStatus.FAILED
-                    sample.error_message = error_message
-
-                    await db.commit()
-                    logger.error(f"Instagram sample {sample_id} processing failed: {error_message}")
-                    return  # Success
-
-            except Exception as e:
-                logger.exception(f"Error in Instagram error handler for sample {sample_id}: {e}")
-                if attempt == max_retries - 1:
-                    raise
-
-    await ctx.step.run("mark-as-failed", update_failed_status)
+    await ctx.step.run("mark-as-failed", mark_sample_failed, sample_id, error_message, "Instagram sample")
 
 
 # Collection processing function
@@ -1364,13 +1565,19 @@ async def filter_new_videos_for_collection(
         return video_list, list(range(cursor, cursor + len(video_list)))
 
 
+async def _get_collection(db: AsyncSession, collection_id: str) -> Collection:
+    """Load a collection by primary key (identity-map aware), raising if it doesn't exist"""
+    collection = await db.get(Collection, uuid.UUID(collection_id))
+    if collection is None:
+        raise NoResultFound(f"Collection {collection_id} not found")
+    return collection
+
+
 async def fetch_collection_from_db(collection_id: str) -> Dict[str, Any]:
     """Fetch collection details from database"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
 
             return {
                 "tiktok_collection_id": collection.tiktok_collection_id,
@@ -1457,17 +1664,20 @@ async def refund_credits_for_failed_stems(stem_ids: List[str]) -> None:
         # Don't raise - we don't want refund failure to stop error handling
 
 
+async def _set_collection_failed(collection_id: str, error_message: str) -> None:
+    """Set collection status to failed with error message, raising on DB errors"""
+    async with AsyncSessionLocal() as db:
+        collection = await _get_collection(db, collection_id)
+        collection.status = CollectionStatus.failed
+        collection.error_message = error_message
+        await db.commit()
+
+
 async def mark_collection_failed(collection_id: str, error_message: str) -> None:
     """Mark collection as failed with error message"""
     try:
-        async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
-            collection.status = CollectionStatus.failed
-            collection.error_message = error_message
-            await db.commit()
-            logger.info(f"Marked collection {collection_id} as failed: {error_message}")
+        await _set_collection_failed(collection_id, error_message)
+        logger.info(f"Marked collection {collection_id} as failed: {error_message}")
     except Exception as e:
         logger.exception(f"Error marking collection {collection_id} as failed: {e}")
         # Don't raise - we've already logged the error
@@ -1477,9 +1687,7 @@ async def update_collection_status(collection_id: str, status: CollectionStatus)
     """Update collection processing status"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
             collection.status = status
             if status == CollectionStatus.processing:
                 collection.started_at = utcnow_naive()
@@ -1736,9 +1944,7 @@ async def update_collection_processed_count(collection_id: str, count: int) -> N
     """Update the processed count for a collection"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
             collection.processed_count = count
             await db.commit()
     except Exception as e:
@@ -1749,9 +1955,7 @@ async def update_collection_total_count(collection_id: str, total_count: int) ->
     """Update the total video count for a collection (after filtering invalid videos)"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
             old_count = collection.total_video_count
             collection.total_video_count = total_count
             await db.commit()
@@ -1768,9 +1972,7 @@ async def complete_collection(
     """Mark collection batch as completed and update pagination info"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
             collection.status = CollectionStatus.completed
             collection.completed_at = utcnow_naive()
             collection.next_cursor = next_cursor
@@ -1789,9 +1991,7 @@ async def update_collection_cursor(
     """Update collection's current_cursor for next batch processing"""
     try:
         async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+            collection = await _get_collection(db, collection_id)
             collection.current_cursor = cursor
             collection.status = CollectionStatus.pending  # Reset to pending for next batch
             await db.commit()
@@ -1812,19 +2012,13 @@ async def handle_collection_error(ctx: inngest.Context) -> None:
     collection_id = event_data.get("collection_id")
     error_message = event_data.get("error", "Unknown error occurred")
 
-    async def update_failed_status():
-        async with AsyncSessionLocal() as db:
-            query = select(Collection).where(Collection.id == uuid.UUID(collection_id))
-            result = await db.execute(query)
-            collection = result.scalar_one()
+    await ctx.step.run("mark-collection-as-failed", record_collection_failure, collection_id, error_message)
 
-            collection.status = CollectionStatus.failed
-            collection.error_message = error_message
-
-            await db.commit()
-            logger.exception(f"Collection {collection_id} processing failed: {error_message}")
 
-    await ctx.step.run("mark-collection-as-failed", update_failed_status)
+async def record_collection_failure(collection_id: str, error_message: str) -> None:
+    """Mark a failed collection from the error handler - DB errors fail the step so Inngest retries it"""
+    await _set_collection_failed(collection_id, error_message)
+    logger.error(f"Collection {collection_id} processing failed: {error_message}")
 
 
 # Pydantic models for Inngest event validation
@@ -1871,87 +2065,88 @@ async def process_stem_separation(ctx: inngest.Context) -> Dict[str, Any]:
 
     logger.info(f"Processing stem separation for sample {sample_id}, stems: {stem_ids}")
 
-    # Step 1: Update all stems to uploading status
-    await ctx.step.run(
-        "update-stems-uploading",
-        update_stems_status,
-        stem_ids,
-        StemProcessingStatus.UPLOADING
-    )
-
-    # Step 2: Download original audio from storage
-    audio_path = await ctx.step.run(
-        "download-original-audio",
-        download_sample_audio,
-        sample_id
-    )
-
-    # Step 3-9: Process each stem type separately
-    # Group stems by type to avoid duplicate processing
-    stems_by_type = {}
-    async with AsyncSessionLocal() as db:
-        for stem_id in stem_ids:
-            query = select(Stem).where(Stem.id == uuid.UUID(stem_id))
-            result = await db.execute(query)
-            stem = result.scalars().first()
-            if stem:
-                stem_type = stem.stem_type.value
-                if stem_type not in stems_by_type:
-                    stems_by_type[stem_type] = []
-                stems_by_type[stem_type].append(str(stem.id))
-
-    # Process each unique stem type
-    for stem_type, stem_id_list in stems_by_type.items():
-        # Use the first stem ID for this type
-        primary_stem_id = stem_id_list[0]
-
-        # Step 3: Upload to La La AI and separate
-        separated_file = await ctx.step.run(
-            f"separate-{stem_type}",
-            separate_stem,
-            audio_path,
-            stem_type,
-            sample_id
+    # Reuse one DB session for every helper in this invocation instead of
+    # opening a fresh session (and pool checkout) per step
+    async with shared_session():
+        # Step 1: Update all stems to uploading status
+        await ctx.step.run(
+            "update-stems-uploading",
+            update_stems_status,
+            stem_ids,
+            StemProcessingStatus.UPLOADING
         )
 
-        # Step 4: Get stem metadata from parent sample (stems inherit parent's BPM/key)
-        stem_analysis = await ctx.step.run(
-            f"get-metadata-{stem_type}",
-            get_stem_metadata_from_parent,
-            separated_file,
+        # Step 2: Download original audio from storage
+        audio_path = await ctx.step.run(
+            "download-original-audio",
+            download_sample_audio,
             sample_id
         )
 
-        # Step 5: Upload to storage
-        stem_urls = await ctx.step.run(
-            f"upload-{stem_type}",
-            upload_stem_to_storage,
-            separated_file,
-            sample_id,
-            stem_type
-        )
+        # Step 3-9: Process each stem type separately
+        # Group stems by type to avoid duplicate processing
+        stems_by_type = {}
+        async with session_scope() as db:
+            for stem_id in stem_ids:
+                stem = await db.get(Stem, uuid.UUID(stem_id))
+                if stem:
+                    stem_type = stem.stem_type.value
+                    if stem_type not in stems_by_type:
+                        stems_by_type[stem_type] = []
+                    stems_by_type[stem_type].append(str(stem.id))
+
+        # Process each unique stem type
+        for stem_type, stem_id_list in stems_by_type.items():
+            # Use the first stem ID for this type
+            primary_stem_id = stem_id_list[0]
+
+            # Step 3: Upload to La La AI and separate
+            separated_file = await ctx.step.run(
+                f"separate-{stem_type}",
+                separate_stem,
+                audio_path,
+                stem_type,
+                sample_id
+            )
+
+            # Step 4: Get stem metadata from parent sample (stems inherit parent's BPM/key)
+            stem_analysis = await ctx.step.run(
+                f"get-metadata-{stem_type}",
+                get_stem_metadata_from_parent,
+                separated_file,
+                sample_id
+            )
+
+            # Step 5: Upload to storage
+            stem_urls = await ctx.step.run(
+                f"upload-{stem_type}",
+                upload_stem_to_storage,
+                separated_file,
+                sample_id,
+                stem_type
+            )
 
-        # Step 6: Update database
+            # Step 6: Update database
+            await ctx.step.run(
+                f"update-{stem_type}",
+                update_stem_complete,
+                primary_stem_id,
+                stem_urls,
+                stem_analysis
+            )
+
+        # Step 7: Clean up temp files
         await ctx.step.run(
-            f"update-{stem_type}",
-            update_stem_complete,
-            primary_stem_id,
-            stem_urls,
-            stem_analysis
+            "cleanup-temp-files",
+            cleanup_stem_temp_files,
+            audio_path
         )
 
-    # Step 7: Clean up temp files
-    await ctx.step.run(
-        "cleanup-temp-files",
-        cleanup_stem_temp_files,
-        audio_path
-    )
-
-    return {
-        "sample_id": sample_id,
-        "stem_ids": stem_ids,
-        "status": "completed"
-    }
+        return {
+            "sample_id": sample_id,
+            "stem_ids": stem_ids,
+            "status": "completed"
+        }
 
 
 @inngest_client.create_function(
@@ -1980,73 +2175,83 @@ async def handle_stem_separation_error(ctx: inngest.Context):
             stem_ids
         )
 
-    async def update_failed_status():
-        async with AsyncSessionLocal() as db:
-            for stem_id in stem_ids:
-                try:
-                    stem_uuid = uuid.UUID(stem_id)
-                    query = select(Stem).where(Stem.id == stem_uuid)
-                    result = await db.execute(query)
-                    stem = result.scalars().first()
+    await ctx.step.run("mark-stems-as-failed", mark_stems_failed, stem_ids, error_message)
 
-                    if stem:
-                        stem.status = StemProcessingStatus.FAILED
-                        stem.error_message = error_message
 
-                except Exception as e:
-                    logger.exception(f"Error updating failed status for stem {stem_id}: {e}")
+async def mark_stems_failed(stem_ids: List[str], error_message: str) -> None:
+    """Mark stems as failed with the same error message"""
+    ids = []
+    for stem_id in stem_ids:
+        try:
+            ids.append(uuid.UUID(stem_id))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.exception(f"Error updating failed status for stem {stem_id}: {e}")
 
-            await db.commit()
-            logger.info(f"Updated {len(stem_ids)} stems to failed status")
+    if not ids:
+        return
 
-    await ctx.step.run("mark-stems-as-failed", update_failed_status)
+    async with AsyncSessionLocal() as db:
+        # Single UPDATE for all stems instead of a SELECT + UPDATE round-trip per stem.
+        # Stems deleted in the meantime simply don't match.
+        result = await db.execute(
+            update(Stem)
+            .where(Stem.id.in_(ids))
+            .values(status=StemProcessingStatus.FAILED, error_message=error_message)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        logger.info(f"Updated {result.rowcount} stems to failed status")
 
 
 async def update_stems_status(stem_ids: List[str], status: StemProcessingStatus) -> None:
     """Update stem processing status in database"""
     try:
-        async with AsyncSessionLocal() as db:
-            for stem_id in stem_ids:
-                stem_uuid = uuid.UUID(stem_id)
-                query = select(Stem).where(Stem.id == stem_uuid)
-                result = await db.execute(query)
-                stem = result.scalars().first()
-
-                if stem:
-                    stem.status = status
-                    logger.info(f"Updated stem {stem_id} status to {status.value}")
-
+        async with session_scope() as db:
+            # Single UPDATE for all stems instead of loading each row to flip one column
+            result = await db.execute(
+                update(Stem)
+                .where(Stem.id.in_([uuid.UUID(stem_id) for stem_id in stem_ids]))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
             await db.commit()
+            logger.info(f"Updated {result.rowcount} stems status to {status.value}")
     except Exception as e:
         logger.exception(f"Error updating stems status: {e}")
         raise
 
 
+def _jittered_backoff(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """
+    Full-jitter exponential backoff delay for retry loops.
+    Spreads out retries from sibling stem jobs racing the same parent sample.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
 async def download_sample_audio(sample_id: str) -> str:
     """Download original sample audio from storage to temp directory (with retry logic)"""
-    temp_dir = Path(tempfile.gettempdir()) / f"stems_{sample_id}"
+    temp_dir = _processing_temp_root() / f"stems_{sample_id}"
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    sample_uuid = uuid.UUID(sample_id)
-    max_retries = 3
-    retry_delay = 0.5
+    sample_uuid = _as_uuid(sample_id)
+    max_retries = 5
 
     for attempt in range(max_retries):
         try:
-            async with AsyncSessionLocal() as db:
+            async with session_scope() as db:
                 logger.info(f"Looking for sample {sample_uuid} for audio download (attempt {attempt + 1}/{max_retries})")
-                query = select(Sample).where(Sample.id == sample_uuid)
-                result = await db.execute(query)
-                sample = result.scalars().first()
+                query = select(Sample.audio_url_wav).where(Sample.id == sample_uuid)
+                audio_url_wav = (await db.execute(query)).scalar_one_or_none()
 
-                if not sample or not sample.audio_url_wav:
+                if not audio_url_wav:
                     if attempt < max_retries - 1:
+                        retry_delay = _jittered_backoff(attempt)
                         logger.warning(
                             f"Sample {sample_uuid} not found or has no audio (attempt {attempt + 1}/{max_retries}). "
-                            f"Retrying in {retry_delay}s..."
+                            f"Retrying in {retry_delay:.2f}s..."
                         )
                         await asyncio.sleep(retry_delay)
-                        retry_delay *= 2
                         continue
                     else:
                         raise ValueError(
@@ -2054,7 +2259,7 @@ async def download_sample_audio(sample_id: str) -> str:
                         )
 
                 # Sample found - download WAV file from storage
-                storage = S3Storage()
+                storage = _get_storage()
                 temp_audio_path = temp_dir / f"original.wav"
 
                 # The actual storage key for audio files is samples/{sample_id}/audio.wav
@@ -2075,10 +2280,26 @@ async def download_sample_audio(sample_id: str) -> str:
             raise
 
 
+# Map our stem types to what Lalal.ai returns
+# Lalal.ai uses 'vocals' (plural), but our DB uses 'vocal' (singular)
+_LALAL_KEY_MAP = MappingProxyType({
+    'vocal': 'vocals',
+    'drum': 'drum',
+    'piano': 'piano',
+    'bass': 'bass',
+    'electric_guitar': 'electric_guitar',
+    'acoustic_guitar': 'acoustic_guitar',
+    'synthesizer': 'synthesizer',
+    'strings': 'strings',
+    'wind': 'wind',
+    'voice': 'voice'
+})
+
+
 async def separate_stem(audio_path: str, stem_type: str, sample_id: str) -> str:
     """Use La La AI to separate a specific stem"""
     try:
-        lalal_service = LalalAIService()
+        lalal_service = _get_lalal_service()
         temp_dir = Path(audio_path).parent / "separated"
         temp_dir.mkdir(parents=True, exist_ok=True)
 
@@ -2093,49 +2314,28 @@ async def separate_stem(audio_path: str, stem_type: str, sample_id: str) -> str:
         # - Single stem: {'vocals': file_path, 'background': file_path}
         # - The stem_type from our database might be singular ('vocal') but Lalal returns plural ('vocals')
 
+        # Try the mapped Lalal.ai key, then the original key, then the
+        # generic 'stem' key used for single-stem separations
         stem_file = None
-
-        # Map our stem types to what Lalal.ai returns
-        # Lalal.ai uses 'vocals' (plural), but our DB uses 'vocal' (singular)
-        lalal_key_mapping = {
-            'vocal': 'vocals',
-            'drum': 'drum',
-            'piano': 'piano',
-            'bass': 'bass',
-            'electric_guitar': 'electric_guitar',
-            'acoustic_guitar': 'acoustic_guitar',
-            'synthesizer': 'synthesizer',
-            'strings': 'strings',
-            'wind': 'wind',
-            'voice': 'voice'
-        }
-
-        # Try to find the stem file with the mapped key
-        mapped_key = lalal_key_mapping.get(stem_type, stem_type)
-        if mapped_key in result:
-            stem_file = result[mapped_key]
-            logger.info(f"Found {stem_type} stem using key '{mapped_key}'")
-        # Fall back to the original key
-        elif stem_type in result:
-            stem_file = result[stem_type]
-            logger.info(f"Found {stem_type} stem by exact name match")
-        # Fall back to generic 'stem' key for single-stem separations
-        elif 'stem' in result:
-            stem_file = result['stem']
-            logger.info(f"Found {stem_type} stem using generic 'stem' key")
+        for result_key in (_LALAL_KEY_MAP.get(stem_type, stem_type), stem_type, 'stem'):
+            if result_key in result:
+                stem_file = result[result_key]
+                logger.info(f"Found {stem_type} stem using key '{result_key}'")
+                break
 
         if not stem_file:
             logger.error(f"Available keys in result: {list(result.keys())}")
             raise ValueError(f"No stem file found in La La AI result for {stem_type}. Available: {list(result.keys())}")
 
-        # Ensure file exists
-        if not Path(stem_file).exists():
+        # Ensure file exists (filesystem calls run off the event loop)
+        if not await asyncio.to_thread(os.path.exists, stem_file):
             raise FileNotFoundError(f"Stem file does not exist: {stem_file}")
 
         # Rename to standardized format if needed
+        # os.replace overwrites atomically, so a retried step can't trip over a leftover file
         final_path = temp_dir / f"{stem_type}.wav"
-        if Path(stem_file) != final_path:
-            Path(stem_file).rename(final_path)
+        if str(stem_file) != str(final_path):
+            await asyncio.to_thread(os.replace, stem_file, final_path)
 
         logger.info(f"Separated {stem_type} stem to {final_path}")
         return str(final_path)
@@ -2145,58 +2345,88 @@ async def separate_stem(audio_path: str, stem_type: str, sample_id: str) -> str:
         raise
 
 
+# In-flight parent sample lookups, keyed by sample_id. Sibling stem jobs running
+# in the same worker process share one query instead of each hitting the DB.
+_parent_metadata_inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+
+async def _fetch_parent_musical_metadata(sample_id: str) -> Dict[str, Any]:
+    """Fetch BPM and key from the parent sample (with retry logic for race conditions)"""
+    sample_uuid = _as_uuid(sample_id)
+    max_retries = 5
+
+    # Retry loop to handle race conditions
+    for attempt in range(max_retries):
+        async with session_scope() as db:
+            logger.info(f"Looking for parent sample {sample_uuid} for stem metadata (attempt {attempt + 1}/{max_retries})")
+            # Only bpm/key are needed - project them instead of hydrating the full Sample
+            query = select(Sample.bpm, Sample.key).where(Sample.id == sample_uuid)
+            parent_row = (await db.execute(query)).first()
+
+            if parent_row is None:
+                if attempt < max_retries - 1:
+                    retry_delay = _jittered_backoff(attempt)
+                    logger.warning(
+                        f"Parent sample {sample_uuid} not found (attempt {attempt + 1}/{max_retries}). "
+                        f"Retrying in {retry_delay:.2f}s..."
+                    )
+                    await asyncio.sleep(retry_delay)
+                    continue
+                else:
+                    raise ValueError(
+                        f"Parent sample {sample_id} not found after {max_retries} retries"
+                    )
+
+            return {
+                "bpm": parent_row.bpm,
+                "key": parent_row.key
+            }
+
+
+async def _get_parent_musical_metadata(sample_id: str) -> Dict[str, Any]:
+    """Single-flight wrapper around _fetch_parent_musical_metadata"""
+    inflight = _parent_metadata_inflight.get(sample_id)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _parent_metadata_inflight[sample_id] = future
+    try:
+        parent_metadata = await _fetch_parent_musical_metadata(sample_id)
+        future.set_result(parent_metadata)
+        return parent_metadata
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved in case no other waiter is attached
+        future.exception()
+        raise
+    finally:
+        _parent_metadata_inflight.pop(sample_id, None)
+
+
 async def get_stem_metadata_from_parent(stem_file_path: str, sample_id: str) -> Dict[str, Any]:
     """Get stem metadata by copying from parent sample (with retry logic for race conditions)"""
     try:
         # Get just the duration from the separated file to verify it was created
-        processor = AudioProcessor()
+        processor = _get_processor()
         metadata = await processor.get_audio_metadata(stem_file_path)
 
-        sample_uuid = uuid.UUID(sample_id)
-        max_retries = 3
-        retry_delay = 0.5
+        parent_metadata = await _get_parent_musical_metadata(sample_id)
 
-        # Retry loop to handle race conditions
-        for attempt in range(max_retries):
-            try:
-                async with AsyncSessionLocal() as db:
-                    logger.info(f"Looking for parent sample {sample_uuid} for stem metadata (attempt {attempt + 1}/{max_retries})")
-                    query = select(Sample).where(Sample.id == sample_uuid)
-                    result = await db.execute(query)
-                    parent_sample = result.scalars().first()
-
-                    if not parent_sample:
-                        if attempt < max_retries - 1:
-                            logger.warning(
-                                f"Parent sample {sample_uuid} not found (attempt {attempt + 1}/{max_retries}). "
-                                f"Retrying in {retry_delay}s..."
-                            )
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 2
-                            continue
-                        else:
-                            raise ValueError(
-                                f"Parent sample {sample_id} not found after {max_retries} retries"
-                            )
+        # Copy BPM, key, and duration from parent sample
+        # Stems are extracted from the same audio, so they have the same musical properties
+        logger.info(f"Copied metadata from parent sample: BPM={parent_metadata['bpm']}, Key={parent_metadata['key']}, Duration={metadata.get('duration'):.1f}s")
 
-                    # Copy BPM, key, and duration from parent sample
-                    # Stems are extracted from the same audio, so they have the same musical properties
-                    logger.info(f"Copied metadata from parent sample: BPM={parent_sample.bpm}, Key={parent_sample.key}, Duration={metadata.get('duration'):.1f}s")
-
-                    return {
-                        "bpm": parent_sample.bpm,
-                        "key": parent_sample.key,
-                        "duration": metadata.get("duration"),  # Use actual stem duration (should match parent)
-                        "sample_rate": metadata.get("sample_rate"),
-                        "channels": metadata.get("channels")
-                    }
-
-            except ValueError:
-                # ValueError is raised when parent sample not found after all retries
-                raise
-            except Exception as e:
-                logger.exception(f"Error getting stem metadata: {e}")
-                raise
+        return {
+            "bpm": parent_metadata["bpm"],
+            "key": parent_metadata["key"],
+            "duration": metadata.get("duration"),  # Use actual stem duration (should match parent)
+            "sample_rate": metadata.get("sample_rate"),
+            "channels": metadata.get("channels")
+        }
 
     except Exception as e:
         logger.exception(f"Error getting stem metadata: {e}")
@@ -2211,41 +2441,48 @@ async def get_stem_metadata_from_parent(stem_file_path: str, sample_id: str) ->
 async def upload_stem_to_storage(stem_file_path: str, sample_id: str, stem_type: str) -> Dict[str, str]:
     """Upload separated stem (WAV and MP3) to storage and return URLs"""
     try:
-        storage = S3Storage()
-        processor = AudioProcessor()
+        storage = _get_storage()
+        processor = _get_processor()
         stem_path = Path(stem_file_path)
 
-        # Convert WAV to MP3
-        mp3_path = stem_path.parent / f"{stem_type}.mp3"
-        import subprocess
-        cmd = [
-            'ffmpeg', '-i', str(stem_path),
-            '-acodec', 'libmp3lame',
-            '-b:a', '320k',
-            '-y',
-            str(mp3_path)
-        ]
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        await process.communicate()
-
-        # Upload both files
         wav_key = f"samples/{sample_id}/stems/{stem_type}.wav"
         mp3_key = f"samples/{sample_id}/stems/{stem_type}.mp3"
 
-        await storage.upload_file(str(stem_path), wav_key)
-        await storage.upload_file(str(mp3_path), mp3_key)
+        # Start the WAV upload while the MP3 is being encoded
+        wav_upload = asyncio.create_task(storage.upload_file(str(stem_path), wav_key))
 
-        wav_url = storage.get_public_url(wav_key)
-        mp3_url = storage.get_public_url(mp3_key)
+        try:
+            # Encode the MP3 to ffmpeg's stdout and stream it straight to storage -
+            # the MP3 isn't needed locally, so it never touches disk
+            cmd = [
+                'ffmpeg', '-nostdin', '-loglevel', 'error',
+                '-i', str(stem_path),
+                '-acodec', 'libmp3lame',
+                '-b:a', '320k',
+                '-f', 'mp3',
+                'pipe:1'
+            ]
+            process = await asyncio.to_thread(
+                subprocess.Popen, cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            try:
+                mp3_upload = storage.upload_stream(process.stdout, mp3_key, "audio/mpeg")
+                # Upload the MP3 alongside the in-flight WAV upload (both share the pooled S3 client)
+                (wav_url, (mp3_url, mp3_size)) = await asyncio.gather(wav_upload, mp3_upload)
+            finally:
+                process.stdout.close()
+                returncode = await asyncio.to_thread(process.wait)
+                stderr = process.stderr.read().decode(errors='replace')
+                process.stderr.close()
+
+            if returncode != 0:
+                raise Exception(f"FFmpeg MP3 encoding failed for {stem_type} stem: {stderr}")
+        except BaseException:
+            wav_upload.cancel()
+            raise
 
         # Get file sizes
         wav_size = stem_path.stat().st_size
-        mp3_size = mp3_path.stat().st_size
 
         logger.info(f"Uploaded {stem_type} stem: WAV={wav_url}, MP3={mp3_url}")
 
@@ -2266,33 +2503,37 @@ async def upload_stem_to_storage(stem_file_path: str, sample_id: str, stem_type:
 async def update_stem_complete(stem_id: str, urls: Dict[str, str], analysis: Dict[str, Any]) -> None:
     """Update stem record with completed processing results"""
     try:
-        async with AsyncSessionLocal() as db:
-            stem_uuid = uuid.UUID(stem_id)
-            query = select(Stem).where(Stem.id == stem_uuid)
-            result = await db.execute(query)
-            stem = result.scalars().first()
+        # Format key as string (e.g., "Ab major") like we do for samples
+        key_data = analysis.get("key")
+        if key_data and isinstance(key_data, dict):
+            key = f"{key_data.get('key')} {key_data.get('scale')}" if key_data.get('key') and key_data.get('scale') else None
+        else:
+            key = key_data
+
+        async with session_scope() as db:
+            # Single UPDATE with the results - no need to load the row first
+            result = await db.execute(
+                update(Stem)
+                .where(Stem.id == uuid.UUID(stem_id))
+                .values(
+                    status=StemProcessingStatus.COMPLETED,
+                    audio_url_wav=urls.get("wav_url"),
+                    audio_url_mp3=urls.get("mp3_url"),
+                    file_path_wav=urls.get("wav_key"),
+                    file_path_mp3=urls.get("mp3_key"),
+                    file_size_wav=urls.get("wav_size"),
+                    file_size_mp3=urls.get("mp3_size"),
+                    bpm=analysis.get("bpm"),
+                    key=key,
+                    duration_seconds=analysis.get("duration"),
+                    completed_at=utcnow_naive()
+                )
+                .execution_options(synchronize_session=False)
+            )
 
-            if not stem:
+            if result.rowcount == 0:
                 raise ValueError(f"Stem {stem_id} not found")
 
-            # Update with results
-            stem.status = StemProcessingStatus.COMPLETED
-            stem.audio_url_wav = urls.get("wav_url")
-            stem.audio_url_mp3 = urls.get("mp3_url")
-            stem.file_path_wav = urls.get("wav_key")
-            stem.file_path_mp3 = urls.get("mp3_key")
-            stem.file_size_wav = urls.get("wav_size")
-            stem.file_size_mp3 = urls.get("mp3_size")
-            stem.bpm = analysis.get("bpm")
-            # Format key as string (e.g., "Ab major") like we do for samples
-            key_data = analysis.get("key")
-            if key_data and isinstance(key_data, dict):
-                stem.key = f"{key_data.get('key')} {key_data.get('scale')}" if key_data.get('key') and key_data.get('scale') else None
-            else:
-                stem.key = key_data
-            stem.duration_seconds = analysis.get("duration")
-            stem.completed_at = utcnow_naive()
-
             await db.commit()
             logger.info(f"Updated stem {stem_id} with completion data")
 
@@ -2306,32 +2547,81 @@ async def cleanup_stem_temp_files(audio_path: str) -> None:
     try:
         temp_dir = Path(audio_path).parent
         if temp_dir.exists():
-            import shutil
-            shutil.rmtree(temp_dir)
+            await asyncio.to_thread(_remove_temp_dir, str(temp_dir))
             logger.info(f"Cleaned up temp directory: {temp_dir}")
     except Exception as e:
         logger.warning(f"Failed to cleanup temp files: {e}")
 
 
+@inngest_client.create_function(
+    fn_id="cleanup-stale-temp-dirs",
+    trigger=inngest.TriggerCron(cron="*/10 * * * *")
+)
+async def cleanup_stale_temp_dirs(ctx: inngest.Context) -> Dict[str, Any]:
+    """
+    Periodically remove processing temp dirs that no run cleaned up.
+    Successful runs remove their own dirs in the background; this catches the
+    ones left behind by runs that crashed or failed before reaching that point.
+    Temp dirs are local to a worker, so this only sweeps the worker that runs it.
+    """
+    removed = await ctx.step.run("remove-stale-temp-dirs", remove_stale_temp_dirs)
+    return {"removed": removed}
+
+
+async def remove_stale_temp_dirs() -> int:
+    """Remove sample/stem temp dirs not modified within STALE_TEMP_DIR_MAX_AGE_MINUTES"""
+    cutoff = time.time() - settings.STALE_TEMP_DIR_MAX_AGE_MINUTES * 60
+    stale_dirs = await asyncio.to_thread(_find_stale_temp_dirs, _processing_temp_root(), cutoff)
+
+    for path in stale_dirs:
+        try:
+            await asyncio.to_thread(_remove_temp_dir, path)
+        except Exception as e:
+            logger.warning(f"Failed to remove stale temp dir {path}: {e}")
+
+    if stale_dirs:
+        logger.info(f"Removed {len(stale_dirs)} stale temp dirs")
+    return len(stale_dirs)
+
+
+def _find_stale_temp_dirs(root: Path, cutoff: float) -> List[str]:
+    """List the pipeline's temp dirs under root last modified before cutoff"""
+    if not root.is_dir():
+        return []
+    with os.scandir(root) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.startswith(("sampletok_", "stems_"))
+            and entry.is_dir(follow_symlinks=False)
+            and entry.stat(follow_symlinks=False).st_mtime < cutoff
+        ]
+
+
 @inngest_client.create_function(
     fn_id="test-function",
     trigger=inngest.TriggerEvent(event="test/hello")
 )
-def test_function(ctx: inngest.Context):
+async def test_function(ctx: inngest.Context):
     """Simple test function for testing Inngest integration"""
     return {"status": "success", "message": "Hello from test function"}
 
 
+# Built once at import - serve() only needs to read it
+_ALL_FUNCTIONS = [
+    process_tiktok_video,
+    process_instagram_video,
+    handle_processing_error,
+    handle_instagram_processing_error,
+    process_collection,
+    handle_collection_error,
+    process_stem_separation,
+    handle_stem_separation_error,
+    cleanup_stale_temp_dirs,
+    test_function
+]
+
+
 def get_all_functions():
     """Return all Inngest functions to be served"""
-    return [
-        process_tiktok_video,
-        process_instagram_video,
-        handle_processing_error,
-        handle_instagram_processing_error,
-        process_collection,
-        handle_collection_error,
-        process_stem_separation,
-        handle_stem_separation_error,
-        test_function
-    ]
\ No newline at end of file
+    return _ALL_FUNCTIONS
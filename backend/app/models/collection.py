@@ -2,8 +2,7 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, BigInteger, Index, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from app.core.database import Base
-from app.utils import utcnow_naive
+from app.core.database import Base, utcnow_sql
 import enum
 import uuid
 
@@ -31,18 +30,26 @@ class Collection(Base):
     has_more = Column(Boolean, default=False, nullable=False)  # Whether there are more videos to import
 
     # Processing status
-    status = Column(SQLEnum(CollectionStatus), default=CollectionStatus.pending, nullable=False, index=True)
+    # VARCHAR + CHECK rather than a Postgres ENUM type (see Sample.status)
+    status = Column(
+        SQLEnum(CollectionStatus, native_enum=False, create_constraint=True, length=20, name='ck_collections_status'),
+        default=CollectionStatus.pending,
+        nullable=False,
+        index=True
+    )
     processed_count = Column(Integer, default=0, nullable=False)  # How many videos we've processed so far
     error_message = Column(String, nullable=True)  # Error details if failed
 
     # Timestamps
-    created_at = Column(DateTime, default=utcnow_naive, nullable=False, index=True)
+    created_at = Column(DateTime, server_default=utcnow_sql, nullable=False, index=True)
     started_at = Column(DateTime, nullable=True)  # When processing started
     completed_at = Column(DateTime, nullable=True)  # When processing completed
 
     # Relationships
-    user = relationship("User", back_populates="collections")
-    collection_samples = relationship("CollectionSample", back_populates="collection", cascade="all, delete-orphan")
+    user = relationship("User", back_populates="collections", lazy='raise_on_sql')
+    collection_samples = relationship("CollectionSample", back_populates="collection", cascade="all, delete-orphan", lazy='raise_on_sql')
+
+    __mapper_args__ = {"eager_defaults": True}
 
     # Index for finding collections by TikTok ID and username
     __table_args__ = (
@@ -58,15 +65,20 @@ class CollectionSample(Base):
     collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False, index=True)
     sample_id = Column(UUID(as_uuid=True), ForeignKey("samples.id", ondelete="CASCADE"), nullable=False, index=True)
     position = Column(Integer, nullable=False)  # Order in the collection (0-based)
-    created_at = Column(DateTime, default=utcnow_naive, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow_sql, nullable=False)
 
     # Relationships
-    collection = relationship("Collection", back_populates="collection_samples")
-    sample = relationship("Sample", back_populates="collection_samples")
+    collection = relationship("Collection", back_populates="collection_samples", lazy='raise_on_sql')
+    sample = relationship("Sample", back_populates="collection_samples", lazy='raise_on_sql')
+
+    __mapper_args__ = {"eager_defaults": True}
 
     # Unique constraint: each sample can only appear once per collection
     # Index for efficient lookups
     __table_args__ = (
         Index('ix_collection_samples_unique', 'collection_id', 'sample_id', unique=True),
-        Index('ix_collection_samples_position', 'collection_id', 'position'),
+        # sample_id is INCLUDEd so ordered page/cover lookups are index-only scans
+        # (the table's autovacuum_vacuum_scale_factor is lowered in the migration
+        # to keep the visibility map current enough for them)
+        Index('ix_collection_samples_position', 'collection_id', 'position', postgresql_include=['sample_id']),
     )
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, DECIMAL, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, DECIMAL, Text, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
 import uuid
 
-from app.core.database import Base
-from app.utils import utcnow_naive
+from app.core.database import Base, utcnow_sql
 
 
 class CreditTransaction(Base):
@@ -45,7 +45,7 @@ class CreditTransaction(Base):
     stripe_payment_intent_id = Column(String(255), nullable=True)
     stripe_invoice_id = Column(String(255), nullable=True)  # CRITICAL for idempotency
     amount_cents = Column(Integer, nullable=True)
-    currency = Column(String(3), default='USD', nullable=True)
+    currency = Column(String(3), nullable=True)  # Only set alongside amount_cents - NULL costs no row space
 
     # Top-up details
     top_up_package = Column(String(20), nullable=True)  # 'small', 'medium', 'large'
@@ -57,7 +57,9 @@ class CreditTransaction(Base):
 
     # Metadata
     description = Column(Text, nullable=True)
-    metadata_json = Column(JSONB, nullable=True)  # Renamed from 'metadata' (reserved by SQLAlchemy)
+    # Renamed from 'metadata' (reserved by SQLAlchemy). Deferred: ledger reads never
+    # need the blob, so it stays out of their SELECTs until explicitly undeferred
+    metadata_json = deferred(Column(JSONB, nullable=True), raiseload=True)
 
     # Related entities
     collection_id = Column(
@@ -80,43 +82,45 @@ class CreditTransaction(Base):
     error_message = Column(Text, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=utcnow_naive, nullable=False)
-    updated_at = Column(DateTime, default=utcnow_naive, onupdate=utcnow_naive, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow_sql, nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow_sql, onupdate=utcnow_sql, nullable=False)
     completed_at = Column(DateTime, nullable=True)
 
     # Relationships
-    user = relationship("User", back_populates="credit_transactions")
-    subscription = relationship("Subscription", back_populates="credit_transactions")
-    collection = relationship("Collection", foreign_keys=[collection_id])
-    sample = relationship("Sample", foreign_keys=[sample_id])
-    stem = relationship("Stem", foreign_keys=[stem_id])
+    user = relationship("User", back_populates="credit_transactions", lazy='raise_on_sql')
+    subscription = relationship("Subscription", back_populates="credit_transactions", lazy='raise_on_sql')
+    collection = relationship("Collection", foreign_keys=[collection_id], lazy='raise_on_sql')
+    sample = relationship("Sample", foreign_keys=[sample_id], lazy='raise_on_sql')
+    stem = relationship("Stem", foreign_keys=[stem_id], lazy='raise_on_sql')
+
+    __mapper_args__ = {"eager_defaults": True}
 
     # Indexes
     __table_args__ = (
-        Index('idx_credit_tx_user', 'user_id'),
         Index('idx_credit_tx_subscription', 'subscription_id'),
         Index('idx_credit_tx_type', 'transaction_type'),
         Index('idx_credit_tx_status', 'status'),
-        Index('idx_credit_tx_created', 'created_at'),
-        # CRITICAL: Composite indexes for common queries
+        # BRIN rather than btree: rows are append-only in created_at order, so
+        # block ranges prune time-window scans with an index a fraction of the size
+        Index('idx_credit_tx_created', 'created_at', postgresql_using='brin'),
+        # CRITICAL: Composite indexes for common queries (user_id lookups use their prefix)
         Index('idx_credit_tx_user_created', 'user_id', 'created_at'),
         Index('idx_credit_tx_user_type', 'user_id', 'transaction_type'),
-        # Partial index for idempotency checks
-        Index('idx_credit_tx_stripe_invoice', 'stripe_invoice_id', postgresql_where=Column('stripe_invoice_id').isnot(None)),
+        # Partial unique index for idempotency - an invoice is credited at most once
+        Index('idx_credit_tx_stripe_invoice_uniq', 'stripe_invoice_id', unique=True, postgresql_where=text('stripe_invoice_id IS NOT NULL')),
     )
 
+    _REPR_FMT = "<CreditTransaction(id={0}, user_id={1}, type={2}, amount={3}, status={4})>".format
+
     def __repr__(self):
-        return (
-            f"<CreditTransaction(id={self.id}, user_id={self.user_id}, "
-            f"type={self.transaction_type}, amount={self.credits_amount}, status={self.status})>"
-        )
+        return self._REPR_FMT(self.id, self.user_id, self.transaction_type, self.credits_amount, self.status)
 
-    @property
+    @hybrid_property
     def is_credit(self) -> bool:
-        """Check if transaction adds credits"""
+        """Check if transaction adds credits (also usable as a SQL filter)"""
         return self.credits_amount > 0
 
-    @property
+    @hybrid_property
     def is_debit(self) -> bool:
-        """Check if transaction deducts credits"""
+        """Check if transaction deducts credits (also usable as a SQL filter)"""
         return self.credits_amount < 0
@@ -4,7 +4,7 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 
-from app.core.database import Base
+from app.core.database import Base, utcnow_sql
 from app.utils import utcnow_naive
 
 
@@ -33,8 +33,10 @@ class InstagramCreator(Base):
     # Cache management
     last_fetched_at = Column(DateTime, default=utcnow_naive)  # When data was last updated
 
-    created_at = Column(DateTime, default=utcnow_naive, index=True)
-    updated_at = Column(DateTime, default=utcnow_naive, onupdate=utcnow_naive)
+    created_at = Column(DateTime, server_default=utcnow_sql, index=True)
+    updated_at = Column(DateTime, server_default=utcnow_sql, onupdate=utcnow_sql)
 
     # Relationships
-    samples = relationship("Sample", back_populates="instagram_creator")
+    samples = relationship("Sample", back_populates="instagram_creator", lazy='raise_on_sql')
+
+    __mapper_args__ = {"eager_defaults": True}
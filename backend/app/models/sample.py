@@ -1,12 +1,11 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Text, ForeignKey, Enum, Index, text
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 import enum
 
-from app.core.database import Base
-from app.utils import utcnow_naive
+from app.core.database import Base, utcnow_sql
 
 
 class ProcessingStatus(enum.Enum):
@@ -48,10 +47,11 @@ class Sample(Base):
     creator_username = Column(String, index=True)
     creator_name = Column(String)
     description = Column(Text)
-    view_count = Column(Integer, default=0)
-    like_count = Column(Integer, default=0)
-    share_count = Column(Integer, default=0)
-    comment_count = Column(Integer, default=0)
+    # 64-bit: view counts on viral posts exceed the int4 range
+    view_count = Column(BigInteger, default=0)
+    like_count = Column(BigInteger, default=0)
+    share_count = Column(BigInteger, default=0)
+    comment_count = Column(BigInteger, default=0)
     upload_timestamp = Column(Integer)  # Unix timestamp from platform
 
     # Audio metadata
@@ -59,10 +59,13 @@ class Sample(Base):
     bpm = Column(Integer)
     key = Column(String)
     genre = Column(String)
-    tags = Column(JSONB, default=list)
+    # GIN-indexed (ix_samples_tags_gin) for overlap filters. The empty default is
+    # filled in by Postgres, so new rows don't build a list per instance
+    tags = Column(ARRAY(Text), server_default=text("'{}'"))
 
-    # Full-text search vector (managed by trigger)
-    search_vector = Column(TSVECTOR, nullable=True)
+    # Full-text search vector (managed by trigger). Only used inside SQL filters and
+    # ranking, so it's deferred - loading Sample rows never ships the lexemes
+    search_vector = deferred(Column(TSVECTOR, nullable=True), raiseload=True)
 
     # File URLs - All stored in our infrastructure (R2/S3/GCS)
     audio_url_wav = Column(String)  # Our stored WAV file
@@ -77,7 +80,12 @@ class Sample(Base):
     file_size_video = Column(Integer)
 
     # Processing information
-    status = Column(Enum(ProcessingStatus), default=ProcessingStatus.PENDING)
+    # Stored as VARCHAR + CHECK rather than a Postgres ENUM type, so adding a
+    # status is a constraint swap instead of an ALTER TYPE
+    status = Column(
+        Enum(ProcessingStatus, native_enum=False, create_constraint=True, length=20, name='ck_samples_status'),
+        default=ProcessingStatus.PENDING
+    )
     error_message = Column(Text)
     processed_at = Column(DateTime)
 
@@ -91,16 +99,26 @@ class Sample(Base):
     tiktok_creator_id = Column(UUID(as_uuid=True), ForeignKey('tiktok_creators.id'), nullable=True)
     instagram_creator_id = Column(UUID(as_uuid=True), ForeignKey('instagram_creators.id'), nullable=True)
 
-    created_at = Column(DateTime, default=utcnow_naive, index=True)
-    updated_at = Column(DateTime, default=utcnow_naive, onupdate=utcnow_naive)
-
-    # Relationships
-    creator = relationship("User", back_populates="samples", foreign_keys=[creator_id])
-    tiktok_creator = relationship("TikTokCreator", back_populates="samples")
-    instagram_creator = relationship("InstagramCreator", back_populates="samples")
-    user_downloads = relationship("UserDownload", back_populates="sample", cascade="all, delete-orphan")
-    user_favorites = relationship("UserFavorite", back_populates="sample", cascade="all, delete-orphan")
-    user_dismissals = relationship("SampleDismissal", back_populates="sample", cascade="all, delete-orphan")
-    collection_samples = relationship("CollectionSample", back_populates="sample", cascade="all, delete-orphan")
-    stems = relationship("Stem", back_populates="parent_sample", cascade="all, delete-orphan")
+    created_at = Column(DateTime, server_default=utcnow_sql, index=True)
+    updated_at = Column(DateTime, server_default=utcnow_sql, onupdate=utcnow_sql)
+
+    # Relationships - raise_on_sql so an unplanned lazy load fails loudly instead of
+    # issuing a query per row; load them with selectinload() where they are needed
+    creator = relationship("User", back_populates="samples", foreign_keys=[creator_id], lazy='raise_on_sql')
+    # Creators are rendered with nearly every sample, so they are batch-loaded by default
+    tiktok_creator = relationship("TikTokCreator", back_populates="samples", lazy='selectin')
+    instagram_creator = relationship("InstagramCreator", back_populates="samples", lazy='selectin')
+    user_downloads = relationship("UserDownload", back_populates="sample", cascade="all, delete-orphan", lazy='raise_on_sql')
+    user_favorites = relationship("UserFavorite", back_populates="sample", cascade="all, delete-orphan", lazy='raise_on_sql')
+    user_dismissals = relationship("SampleDismissal", back_populates="sample", cascade="all, delete-orphan", lazy='raise_on_sql')
+    collection_samples = relationship("CollectionSample", back_populates="sample", cascade="all, delete-orphan", lazy='raise_on_sql')
+    stems = relationship("Stem", back_populates="parent_sample", cascade="all, delete-orphan", lazy='raise_on_sql')
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    # A creator's latest samples, read straight off the index in display order
+    __table_args__ = (
+        Index('ix_samples_tt_creator_created', tiktok_creator_id, created_at.desc()),
+        Index('ix_samples_ig_creator_created', instagram_creator_id, created_at.desc()),
+    )
     
\ No newline at end of file
@@ -4,6 +4,12 @@ from datetime import datetime
 from uuid import UUID
 import re
 
+# Validation patterns, compiled once at import. The URL patterns only need a
+# prefix match, so they stop at the path separator instead of scanning with .*
+TIKTOK_URL_PATTERN = re.compile(r'(https?://)?(www\.)?(tiktok\.com|vm\.tiktok\.com)/')
+INSTAGRAM_URL_PATTERN = re.compile(r'(https?://)?(www\.)?(instagram\.com|instagr\.am)/')
+TIKTOK_USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_.]+$')
+
 
 # User Schemas
 class UserBase(BaseModel):
@@ -54,8 +60,7 @@ class TikTokURLInput(BaseModel):
     @validator('url')
     def validate_tiktok_url(cls, v):
         url_str = str(v)
-        tiktok_pattern = r'(https?://)?(www\.)?(tiktok\.com|vm\.tiktok\.com)/.*'
-        if not re.match(tiktok_pattern, url_str):
+        if not TIKTOK_URL_PATTERN.match(url_str):
             raise ValueError('Invalid TikTok URL format')
         return v
 
@@ -66,8 +71,7 @@ class InstagramURLInput(BaseModel):
     @validator('url')
     def validate_instagram_url(cls, v):
         url_str = str(v)
-        instagram_pattern = r'(https?://)?(www\.)?(instagram\.com|instagr\.am)/.*'
-        if not re.match(instagram_pattern, url_str):
+        if not INSTAGRAM_URL_PATTERN.match(url_str):
             raise ValueError('Invalid Instagram URL format')
         return v
 
@@ -422,7 +426,7 @@ class ProcessCollectionRequest(BaseModel):
         # TikTok usernames: 1-30 chars, alphanumeric + underscore + period
         if len(v) < 1 or len(v) > 30:
             raise ValueError('Username must be between 1 and 30 characters')
-        if not re.match(r'^[a-zA-Z0-9_.]+$', v):
+        if not TIKTOK_USERNAME_PATTERN.match(v):
             raise ValueError('Username can only contain letters, numbers, underscores, and periods')
         return v
 
@@ -465,6 +469,7 @@ class CollectionResponse(BaseModel):
 class CollectionWithSamplesResponse(CollectionResponse):
     """Collection with associated samples"""
     samples: List[SampleResponse] = []
+    samples_next_position: Optional[int] = None  # Pass as after_position for the next page (None on the last page)
 
 
 class CollectionStatusResponse(BaseModel):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Enum, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -75,5 +75,15 @@ class Stem(Base):
     user_downloads = relationship("UserStemDownload", back_populates="stem", cascade="all, delete-orphan")
     user_favorites = relationship("UserStemFavorite", back_populates="stem", cascade="all, delete-orphan")
 
+    # Partial index over the unfinished stems only (a small, shrinking slice of the
+    # table) for the stuck/failed retrigger scan - completed rows never enter it
+    __table_args__ = (
+        Index(
+            'ix_stems_unfinished',
+            'created_at',
+            postgresql_where=text("status IN ('PENDING', 'UPLOADING', 'PROCESSING', 'FAILED')")
+        ),
+    )
+
     def __repr__(self):
         return f"<Stem {self.id} - {self.stem_type.value} from Sample {self.parent_sample_id}>"
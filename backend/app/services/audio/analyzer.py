@@ -1,11 +1,95 @@
+import asyncio
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import librosa
-import essentia.standard as es
+import numpy as np
+import soundfile as sf
+
+from app.core.config import settings
+from app.services.audio.shared_audio import attach_shared_audio
 
 logger = logging.getLogger(__name__)
 
+# Essentia's C++ extractors are the primary analysis path. If the native wheel
+# isn't available on a platform, fall back to librosa for both BPM and key.
+try:
+    import essentia.standard as es
+except ImportError:
+    es = None
+    logger.warning("Essentia not available - falling back to librosa for audio analysis")
+
+# Sample rate used for key detection and the librosa fallback. Tonal and onset
+# features don't need full-band audio, and halving the rate roughly halves FFT work.
+# (RhythmExtractor2013 only supports 44100 Hz, so Essentia BPM detection stays there.)
+ANALYSIS_SAMPLE_RATE = 22050
+RHYTHM_SAMPLE_RATE = 44100
+
+# Constant-Q transform shared by the librosa BPM and key fallbacks - the
+# chroma_cqt defaults (7 octaves, 3 bins per semitone) at the beat tracker's hop
+CQT_HOP_LENGTH = 512
+CQT_BINS_PER_OCTAVE = 36
+CQT_N_BINS = 7 * CQT_BINS_PER_OCTAVE
+
+# Key names in the same spelling Essentia's KeyExtractor returns
+KEY_NAMES = ('C', 'C#', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B')
+
+# Krumhansl-Kessler key profiles for the librosa key detection fallback
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+@lru_cache(maxsize=1)
+def _get_analysis_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for BPM/key analysis, created on first use.
+    Analysis holds the GIL for long stretches, so separate processes let several
+    samples analyze in parallel across cores. Uses spawn to avoid forking a
+    process that already has DB/HTTP client threads running.
+    """
+    return ProcessPoolExecutor(
+        max_workers=settings.PIPELINE_ANALYSIS_WORKERS or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_worker
+    )
+
+
+def _warm_up_worker() -> None:
+    """
+    Pre-compile librosa's numba kernels when librosa is the primary analysis path,
+    so the first real sample in each spawned worker doesn't pay the JIT cost.
+    Compiled kernels are reused across workers via numba's on-disk cache (NUMBA_CACHE_DIR).
+    """
+    if es is not None:
+        return
+    try:
+        y = np.random.default_rng(0).standard_normal(ANALYSIS_SAMPLE_RATE).astype(np.float32)
+        librosa.beat.beat_track(y=y, sr=ANALYSIS_SAMPLE_RATE)
+    except Exception as e:
+        logger.warning(f"librosa warm-up failed: {e}")
+
+
+def _analyze_in_process(audio_path: str) -> Dict:
+    """Entry point executed inside an analysis pool worker"""
+    return AudioAnalyzer().analyze_audio_sync(audio_path)
+
+
+def _analyze_shared_in_process(descriptor: Dict[str, Any]) -> Dict:
+    """Entry point for analyzing samples already decoded into shared memory"""
+    shm, samples = attach_shared_audio(descriptor)
+    try:
+        # Downmix copies out of the shared buffer, so the view can be dropped right away
+        mono = np.ascontiguousarray(samples.mean(axis=1), dtype=np.float32)
+        del samples
+        return AudioAnalyzer().analyze_samples_sync(mono, descriptor['sample_rate'])
+    finally:
+        shm.close()
+
 
 class AudioAnalyzer:
     """Analyze audio files to extract musical features like BPM and key"""
@@ -14,37 +98,76 @@ class AudioAnalyzer:
         """
         Analyze audio file and extract musical features
         Returns dict with bpm, key, scale, and confidence scores
+
+        Essentia/librosa analysis is CPU-bound, so it runs in the analysis process
+        pool to keep the event loop free for concurrent downloads, uploads and DB calls.
         """
         audio_path = Path(audio_path)
 
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
+        return await self._run_in_pool(_analyze_in_process, str(audio_path))
+
+    async def analyze_shared_audio(self, descriptor: Dict[str, Any]) -> Dict:
+        """
+        Analyze samples decoded once by decode_to_shared_memory.
+        Skips re-reading and re-decoding the WAV in the pool worker.
+        """
+        return await self._run_in_pool(_analyze_shared_in_process, descriptor)
+
+    async def _run_in_pool(self, fn, *args) -> Dict:
+        """Run an analysis entry point in the process pool"""
+        loop = asyncio.get_running_loop()
         try:
+            return await loop.run_in_executor(_get_analysis_pool(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. native crash) - recreate the pool on next use
+            logger.error("Audio analysis worker crashed, resetting process pool")
+            _get_analysis_pool.cache_clear()
+            raise
+
+    def analyze_audio_sync(self, audio_path: str) -> Dict:
+        """Blocking implementation of analyze_audio"""
+        try:
+            # Decode once with libsndfile and run both detectors on the same signal
+            samples, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+        except Exception as e:
+            logger.error(f"Error analyzing audio: {str(e)}")
+            return self._empty_analysis()
+
+        return self.analyze_samples_sync(samples.mean(axis=1), sample_rate)
+
+    def analyze_samples_sync(self, mono: np.ndarray, sample_rate: int) -> Dict:
+        """Blocking analysis of an in-memory mono signal"""
+        try:
+            analysis_audio = self._resample(mono, sample_rate, ANALYSIS_SAMPLE_RATE)
+
+            if es is None:
+                # librosa only - BPM and key from one shared transform
+                bpm, key_data = self._librosa_analysis(analysis_audio, ANALYSIS_SAMPLE_RATE)
+                return self._format_analysis(bpm, key_data)
+
             # Detect BPM
-            bpm = await self.detect_bpm(str(audio_path))
+            bpm = None
+            try:
+                bpm = self._essentia_bpm(self._resample(mono, sample_rate, RHYTHM_SAMPLE_RATE))
+            except Exception as e:
+                logger.error(f"Error detecting BPM: {str(e)}")
+                logger.info("Falling back to librosa for BPM detection...")
+            if bpm is None:
+                bpm = self._librosa_bpm(analysis_audio, ANALYSIS_SAMPLE_RATE)
 
             # Detect key
-            key_data = await self.detect_key(str(audio_path))
+            key_data = self._essentia_key(analysis_audio)
 
-            return {
-                'bpm': bpm,
-                'key': key_data['key'],
-                'scale': key_data['scale'],
-                'key_confidence': key_data['confidence']
-            }
+            return self._format_analysis(bpm, key_data)
 
         except Exception as e:
             logger.error(f"Error analyzing audio: {str(e)}")
-            # Return partial results or None values on failure
-            return {
-                'bpm': None,
-                'key': None,
-                'scale': None,
-                'key_confidence': None
-            }
+            return self._empty_analysis()
 
-    async def detect_bpm(self, audio_path: str) -> Optional[int]:
+    def detect_bpm(self, audio_path: str) -> Optional[int]:
         """
         Detect BPM (tempo) using Essentia's RhythmExtractor2013
         More accurate than librosa, handles octave errors better
@@ -53,50 +176,102 @@ class AudioAnalyzer:
         Note: Automatic BPM detection can have octave errors (detecting 2x or 0.5x the actual tempo).
         This is a fundamental limitation of algorithmic tempo detection.
         """
-        try:
-            logger.info(f"Detecting BPM for {audio_path}")
+        logger.info(f"Detecting BPM for {audio_path}")
 
-            # Load audio file using Essentia (requires 44100 Hz)
-            audio = es.MonoLoader(filename=audio_path, sampleRate=44100)()
+        if es is not None:
+            try:
+                # Load audio file using Essentia (requires 44100 Hz)
+                audio = es.MonoLoader(filename=audio_path, sampleRate=RHYTHM_SAMPLE_RATE)()
+                return self._essentia_bpm(audio)
+            except Exception as e:
+                logger.error(f"Error detecting BPM: {str(e)}")
+                # Fallback to librosa if Essentia fails
+                logger.info("Falling back to librosa for BPM detection...")
 
-            # Extract rhythm features using RhythmExtractor2013
-            # Use 'multifeature' method for better accuracy (slower but more precise)
-            rhythm_extractor = es.RhythmExtractor2013(method="multifeature")
-            bpm, beats, beats_confidence, _, beats_intervals = rhythm_extractor(audio)
+        try:
+            y = self._load_mono(audio_path, ANALYSIS_SAMPLE_RATE)
+        except Exception as fallback_error:
+            logger.error(f"Fallback BPM detection also failed: {fallback_error}")
+            return None
+        return self._librosa_bpm(y, ANALYSIS_SAMPLE_RATE)
 
-            bpm_int = int(round(bpm)) if bpm else None
+    def detect_key(self, audio_path: str) -> Dict:
+        """
+        Detect musical key using Essentia's KeyExtractor
+        Returns dict with key, scale (major/minor), and confidence
+        """
+        logger.info(f"Detecting key for {audio_path}")
 
-            logger.info(f"Detected BPM: {bpm_int} (confidence: {beats_confidence:.2f})")
-            return bpm_int
+        try:
+            if es is not None:
+                # Load audio file using Essentia, downsampled for analysis
+                audio = es.MonoLoader(filename=audio_path, sampleRate=ANALYSIS_SAMPLE_RATE)()
+                return self._essentia_key(audio)
+
+            y = self._load_mono(audio_path, ANALYSIS_SAMPLE_RATE)
+            return self._librosa_key(y, ANALYSIS_SAMPLE_RATE)
 
         except Exception as e:
-            logger.error(f"Error detecting BPM: {str(e)}")
-            # Fallback to librosa if Essentia fails
-            try:
-                logger.info("Falling back to librosa for BPM detection...")
-                y, sr = librosa.load(audio_path, sr=None)
-                tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-                bpm_int = int(tempo) if tempo else None
-                logger.info(f"Librosa detected BPM: {bpm_int}")
-                return bpm_int
-            except Exception as fallback_error:
-                logger.error(f"Fallback BPM detection also failed: {fallback_error}")
-                return None
-
-    async def detect_key(self, audio_path: str) -> Dict:
+            logger.error(f"Error detecting key: {str(e)}")
+            return self._empty_key()
+
+    def _essentia_bpm(self, audio: np.ndarray) -> Optional[int]:
+        """BPM from a 44.1 kHz mono signal using Essentia's RhythmExtractor2013"""
+        # Extract rhythm features using RhythmExtractor2013
+        # Use 'multifeature' method for better accuracy (slower but more precise)
+        rhythm_extractor = es.RhythmExtractor2013(method="multifeature")
+        bpm, beats, beats_confidence, _, beats_intervals = rhythm_extractor(audio)
+
+        bpm_int = int(round(bpm)) if bpm else None
+
+        logger.info(f"Detected BPM: {bpm_int} (confidence: {beats_confidence:.2f})")
+        return bpm_int
+
+    def _librosa_analysis(self, y: np.ndarray, sr: int) -> Tuple[Optional[int], Dict]:
         """
-        Detect musical key using Essentia's KeyExtractor
-        Returns dict with key, scale (major/minor), and confidence
+        BPM and key with librosa (fallback when Essentia is unavailable)
+        The constant-Q transform is the expensive part of both, so it is computed
+        once and fed to the onset envelope and the chroma features.
         """
         try:
-            logger.info(f"Detecting key for {audio_path}")
+            cqt = np.abs(librosa.cqt(
+                y=y,
+                sr=sr,
+                hop_length=CQT_HOP_LENGTH,
+                n_bins=CQT_N_BINS,
+                bins_per_octave=CQT_BINS_PER_OCTAVE
+            ))
+        except Exception as e:
+            logger.error(f"Error computing CQT, analyzing without a shared transform: {str(e)}")
+            return self._librosa_bpm(y, sr), self._librosa_key(y, sr)
 
-            # Load audio file using Essentia
-            audio = es.MonoLoader(filename=audio_path)()
+        return self._librosa_bpm(y, sr, cqt), self._librosa_key(y, sr, cqt)
 
+    def _librosa_bpm(self, y: np.ndarray, sr: int, cqt: Optional[np.ndarray] = None) -> Optional[int]:
+        """BPM with librosa's beat tracker (fallback when Essentia is unavailable or fails)"""
+        try:
+            if cqt is not None:
+                onset_env = librosa.onset.onset_strength(
+                    S=librosa.amplitude_to_db(cqt, ref=np.max),
+                    sr=sr,
+                    hop_length=CQT_HOP_LENGTH
+                )
+                tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=CQT_HOP_LENGTH)
+            else:
+                tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+            bpm_int = int(tempo) if tempo else None
+            logger.info(f"Librosa detected BPM: {bpm_int}")
+            return bpm_int
+        except Exception as fallback_error:
+            logger.error(f"Fallback BPM detection also failed: {fallback_error}")
+            return None
+
+    def _essentia_key(self, audio: np.ndarray) -> Dict:
+        """Key from a mono signal at ANALYSIS_SAMPLE_RATE using Essentia's KeyExtractor"""
+        try:
             # Extract key using KeyExtractor algorithm
             # Uses 'bgate' profile by default (best for general pop/electronic music)
-            key_extractor = es.KeyExtractor()
+            key_extractor = es.KeyExtractor(sampleRate=ANALYSIS_SAMPLE_RATE)
             key, scale, strength = key_extractor(audio)
 
             logger.info(f"Detected key: {key} {scale} (confidence: {strength:.2f})")
@@ -109,8 +284,73 @@ class AudioAnalyzer:
 
         except Exception as e:
             logger.error(f"Error detecting key: {str(e)}")
+            return self._empty_key()
+
+    def _librosa_key(self, y: np.ndarray, sr: int, cqt: Optional[np.ndarray] = None) -> Dict:
+        """
+        Key with librosa (fallback when Essentia is unavailable)
+        Correlates the average CQT chroma against major/minor key profiles
+        """
+        try:
+            if cqt is not None:
+                chroma = librosa.feature.chroma_cqt(C=cqt, sr=sr, bins_per_octave=CQT_BINS_PER_OCTAVE)
+            else:
+                chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+            chroma = chroma.mean(axis=1)
+
+            # Correlate against the profile rotated to each of the 12 tonics
+            best_key, best_scale, best_score = None, None, -np.inf
+            for scale, profile in (('major', MAJOR_PROFILE), ('minor', MINOR_PROFILE)):
+                scores = np.array([np.corrcoef(chroma, np.roll(profile, shift))[0, 1] for shift in range(12)])
+                shift = int(np.nanargmax(scores))
+                if scores[shift] > best_score:
+                    best_key, best_scale, best_score = KEY_NAMES[shift], scale, float(scores[shift])
+
+            logger.info(f"Librosa detected key: {best_key} {best_scale} (confidence: {best_score:.2f})")
+
             return {
-                'key': None,
-                'scale': None,
-                'confidence': None
+                'key': best_key,
+                'scale': best_scale,
+                'confidence': best_score
             }
+
+        except Exception as e:
+            logger.error(f"Error detecting key with librosa: {str(e)}")
+            return self._empty_key()
+
+    def _load_mono(self, audio_path: str, target_sr: int) -> np.ndarray:
+        """Read a file with soundfile (libsndfile) and return a mono signal at target_sr"""
+        samples, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+        return self._resample(samples.mean(axis=1), sample_rate, target_sr)
+
+    def _resample(self, y: np.ndarray, sr: int, target_sr: int) -> np.ndarray:
+        """Resample a mono signal, using Essentia's resampler when available"""
+        if sr == target_sr:
+            return y
+        if es is not None:
+            return es.Resample(inputSampleRate=float(sr), outputSampleRate=float(target_sr))(y)
+        return librosa.resample(y, orig_sr=sr, target_sr=target_sr)
+
+    def _format_analysis(self, bpm: Optional[int], key_data: Dict) -> Dict:
+        return {
+            'bpm': bpm,
+            'key': key_data['key'],
+            'scale': key_data['scale'],
+            'key_confidence': key_data['confidence']
+        }
+
+    def _empty_analysis(self) -> Dict:
+        # Return partial results or None values on failure
+        return {
+            'bpm': None,
+            'key': None,
+            'scale': None,
+            'key_confidence': None
+        }
+
+    def _empty_key(self) -> Dict:
+        return {
+            'key': None,
+            'scale': None,
+            'confidence': None
+        }
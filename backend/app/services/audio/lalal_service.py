@@ -19,6 +19,15 @@ from app.services.audio.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+async def _iter_file(file_path: Path):
+    """Yield a file's contents in chunks, with the disk reads offloaded so they don't stall the event loop"""
+    with open(file_path, 'rb') as f:
+        while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+
 
 class LalalAIService:
     """Service for interacting with La La AI stem separation API"""
@@ -98,10 +107,6 @@ class LalalAIService:
 
         try:
             async with httpx.AsyncClient(timeout=300.0) as client:
-                # Read file as binary data
-                with open(file_path, 'rb') as f:
-                    file_content = f.read()
-
                 # Lalal.ai requires Content-Disposition header with filename
                 # Try ASCII encoding first, fall back to UTF-8 if needed
                 try:
@@ -116,15 +121,19 @@ class LalalAIService:
                 # Merge Content-Disposition with existing headers
                 upload_headers = {
                     **self.headers,
-                    "Content-Disposition": content_disposition
+                    "Content-Disposition": content_disposition,
+                    # Known up front, so the streamed body isn't sent chunked
+                    "Content-Length": str(file_size)
                 }
 
-                logger.info(f"Uploading file: {file_path.name} (size: {len(file_content)} bytes)")
+                logger.info(f"Uploading file: {file_path.name} (size: {file_size} bytes)")
 
                 response = await client.post(
                     f"{self.BASE_URL}/upload/",
                     headers=upload_headers,
-                    content=file_content  # Send as binary data, not multipart
+                    # Stream the file from disk as binary data (not multipart)
+                    # instead of reading the whole WAV into memory first
+                    content=_iter_file(file_path)
                 )
 
                 response.raise_for_status()
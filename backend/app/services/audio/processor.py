@@ -5,10 +5,18 @@ from typing import Dict, Optional
 import subprocess
 import json
 
+import numpy as np
+import soundfile as sf
+from PIL import Image, ImageColor
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Waveform colors per channel (left, right) - pink to purple
+WAVEFORM_COLORS = ('#EC4899', '#8B5CF6')
+WAVEFORM_RGBA = tuple(ImageColor.getrgb(color) + (255,) for color in WAVEFORM_COLORS)
+
 
 class AudioProcessor:
     """Process audio from video files"""
@@ -29,38 +37,31 @@ class AudioProcessor:
         mp3_path = output_dir / f"{video_path.stem}.mp3"
 
         try:
-            # Extract to WAV (24-bit, 48kHz)
-            wav_cmd = [
-                'ffmpeg', '-i', str(video_path),
+            # Decode the video's audio once and encode both outputs from it in a
+            # single ffmpeg run, rather than extracting the WAV and re-reading it
+            # for the MP3
+            cmd = [
+                'ffmpeg', '-y',  # Overwrite
+                '-i', str(video_path),
+                # WAV (24-bit, 48kHz)
                 '-vn',  # No video
                 '-acodec', 'pcm_s24le',  # 24-bit PCM
                 '-ar', str(settings.AUDIO_SAMPLE_RATE),  # 48kHz
                 '-ac', '2',  # Stereo
-                '-y',  # Overwrite
-                str(wav_path)
-            ]
-
-            # Run ffmpeg command
-            result = await self._run_command(wav_cmd)
-            if result.returncode != 0:
-                raise Exception(f"FFmpeg WAV extraction failed: {result.stderr}")
-
-            # Convert to MP3 (320kbps)
-            mp3_cmd = [
-                'ffmpeg', '-i', str(wav_path),
+                str(wav_path),
+                # MP3 (320kbps) from the same decoded stream
+                '-vn',
                 '-acodec', 'libmp3lame',
                 '-b:a', f'{settings.MP3_BITRATE}k',
-                '-y',
+                '-ar', str(settings.AUDIO_SAMPLE_RATE),
+                '-ac', '2',
                 str(mp3_path)
             ]
 
-            result = await self._run_command(mp3_cmd)
+            # Run ffmpeg command
+            result = await self._run_command(cmd)
             if result.returncode != 0:
-                raise Exception(f"FFmpeg MP3 conversion failed: {result.stderr}")
-
-            # Normalize audio levels
-            await self.normalize_audio(str(wav_path))
-            await self.normalize_audio(str(mp3_path))
+                raise Exception(f"FFmpeg audio extraction failed: {result.stderr}")
 
             return {
                 'wav': str(wav_path),
@@ -71,22 +72,6 @@ class AudioProcessor:
             logger.error(f"Error extracting audio: {str(e)}")
             raise
 
-    async def normalize_audio(self, audio_path: str) -> None:
-        """Normalize audio levels using ffmpeg"""
-        temp_path = f"{audio_path}.temp"
-
-        cmd = [
-            'ffmpeg', '-i', audio_path,
-            '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
-            '-y',
-            temp_path
-        ]
-
-        result = await self._run_command(cmd)
-        if result.returncode == 0:
-            # Replace original with normalized
-            Path(temp_path).replace(audio_path)
-
     async def generate_hls_stream(self, audio_path: str, output_dir: str) -> Dict[str, any]:
         """
         Generate HLS stream from audio file at 320kbps
@@ -150,15 +135,24 @@ class AudioProcessor:
             logger.error(f"Error generating HLS stream: {str(e)}")
             raise
 
-    async def generate_waveform(self, audio_path: str, output_dir: str) -> str:
+    async def generate_waveform(self, audio_path: str, output_dir: str, samples: Optional[np.ndarray] = None) -> str:
         """
         Generate normalized waveform visualization with consistent amplitude display
         Returns path to waveform image
+
+        Pass already-decoded samples (frames, channels) to skip reading the file again.
         """
         audio_path = Path(audio_path)
         output_dir = Path(output_dir)
         waveform_path = output_dir / f"{audio_path.stem}_waveform.png"
 
+        try:
+            # Render in-process with NumPy/Pillow (runs in a thread - it's CPU-bound)
+            await asyncio.to_thread(self._render_waveform, str(audio_path), str(waveform_path), samples)
+            return str(waveform_path)
+        except Exception as e:
+            logger.warning(f"In-process waveform render failed, falling back to ffmpeg: {str(e)}")
+
         try:
             # Use ffmpeg to generate normalized waveform with pink to purple gradient
             # scale=sqrt compresses dynamic range so all waveforms appear similar in size
@@ -181,8 +175,50 @@ class AudioProcessor:
             logger.error(f"Error generating waveform: {str(e)}")
             raise
 
+    def _render_waveform(self, audio_path: str, waveform_path: str, samples: Optional[np.ndarray] = None) -> None:
+        """
+        Render the waveform PNG directly from the PCM samples.
+        Matches ffmpeg's showwavespic output: one peak bar per pixel column,
+        sqrt amplitude scaling, one color per channel on a transparent background.
+        """
+        width = settings.WAVEFORM_WIDTH
+        height = settings.WAVEFORM_HEIGHT
+
+        if samples is None:
+            samples, _ = sf.read(audio_path, dtype='float32', always_2d=True)
+        if samples.shape[0] == 0:
+            raise ValueError(f"Audio file has no samples: {audio_path}")
+
+        # Peak absolute amplitude per pixel column and channel in a single
+        # vectorized pass -> shape (width, channels)
+        column_starts = np.linspace(0, samples.shape[0], width, endpoint=False).astype(np.intp)
+        peaks = np.maximum.reduceat(np.abs(samples), column_starts, axis=0)
+
+        # scale=sqrt compresses dynamic range so all waveforms appear similar in size
+        half_heights = np.sqrt(np.clip(peaks, 0.0, 1.0)) * (height / 2)
+
+        # Quantize each bar to integer pixel rows once, then paint every bar of a
+        # channel with a single mask instead of drawing the lines one by one
+        center = height / 2
+        tops = np.rint(center - half_heights).astype(np.int16)
+        bottoms = np.rint(center + half_heights).astype(np.int16)
+        rows = np.arange(height, dtype=np.int16)[:, np.newaxis]
+
+        pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        for channel in range(half_heights.shape[1]):
+            bars = (rows >= tops[:, channel]) & (rows <= bottoms[:, channel])
+            pixels[bars] = WAVEFORM_RGBA[channel % len(WAVEFORM_RGBA)]
+
+        Image.fromarray(pixels).save(waveform_path, format='PNG')
+
     async def get_audio_metadata(self, audio_path: str) -> Dict:
         """Extract metadata from audio file"""
+        # libsndfile reads the header in-process - no ffprobe subprocess per file
+        try:
+            return await asyncio.to_thread(self._read_audio_metadata, audio_path)
+        except Exception as e:
+            logger.debug(f"soundfile could not read {audio_path}, falling back to ffprobe: {e}")
+
         cmd = [
             'ffprobe',
             '-v', 'quiet',
@@ -217,6 +253,19 @@ class AudioProcessor:
             'bitrate': int(metadata.get('format', {}).get('bit_rate', 0))
         }
 
+    def _read_audio_metadata(self, audio_path: str) -> Dict:
+        """Read audio metadata from the file header with soundfile"""
+        info = sf.info(audio_path)
+        file_size = Path(audio_path).stat().st_size
+
+        return {
+            'duration': info.duration,
+            'sample_rate': info.samplerate,
+            'channels': info.channels,
+            'format': info.format.lower(),
+            'bitrate': int(file_size * 8 / info.duration) if info.duration else 0
+        }
+
     async def _run_command(self, cmd: list) -> subprocess.CompletedProcess:
         """Run shell command asynchronously"""
         process = await asyncio.create_subprocess_exec(
@@ -0,0 +1,68 @@
+import logging
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+
+def decode_to_shared_memory(audio_path: str) -> Tuple[SharedMemory, np.ndarray, Dict[str, Any]]:
+    """
+    Decode an audio file once into a shared memory block.
+
+    Returns the SharedMemory handle (owned by the caller, release with
+    release_shared_audio), a zero-copy array view of the samples with shape
+    (frames, channels), and a picklable descriptor that other processes can
+    pass to attach_shared_audio.
+    """
+    info = sf.info(audio_path)
+    shape = (info.frames, info.channels)
+    dtype = np.dtype('float32')
+
+    shm = SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    try:
+        samples = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        # Decode straight into the shared buffer - no intermediate copy
+        sf.read(audio_path, dtype='float32', always_2d=True, out=samples)
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+
+    descriptor = {
+        'name': shm.name,
+        'shape': shape,
+        'dtype': dtype.str,
+        'sample_rate': info.samplerate
+    }
+    return shm, samples, descriptor
+
+
+def attach_shared_audio(descriptor: Dict[str, Any]) -> Tuple[SharedMemory, np.ndarray]:
+    """
+    Attach to samples decoded by decode_to_shared_memory (e.g. from a pool worker).
+    The caller must close() the returned handle but never unlink it.
+    """
+    shm = SharedMemory(name=descriptor['name'])
+    samples = np.ndarray(descriptor['shape'], dtype=np.dtype(descriptor['dtype']), buffer=shm.buf)
+    return shm, samples
+
+
+def release_shared_audio(shm: SharedMemory) -> None:
+    """Unlink and close a shared memory block created by decode_to_shared_memory"""
+    # Unlink first so the segment is always removed, even if a lingering array
+    # view (e.g. held by a traceback) makes close() fail - the memory is then
+    # freed once that view is garbage collected
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to unlink shared audio buffer {shm.name}: {e}")
+
+    try:
+        shm.close()
+    except BufferError as e:
+        logger.warning(f"Shared audio buffer {shm.name} still has live views: {e}")
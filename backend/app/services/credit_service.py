@@ -12,10 +12,11 @@ All operations create CreditTransaction records for complete audit trail.
 
 import logging
 from typing import Optional, Dict, Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update, select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from app.models.user import User
@@ -95,32 +96,6 @@ class CreditService:
                         details={"user_id": str(user_id)}
                     )
 
-                # 🔍 IDEMPOTENCY CHECK: Has this exact transaction been processed?
-                if stripe_invoice_id:
-                    existing = await self.db.execute(
-                        select(CreditTransaction)
-                        .where(
-                            CreditTransaction.user_id == user_id,
-                            CreditTransaction.stripe_invoice_id == stripe_invoice_id,
-                            CreditTransaction.transaction_type == transaction_type,
-                            CreditTransaction.status == 'completed'
-                        )
-                    )
-                    existing_tx = existing.scalar_one_or_none()
-
-                    if existing_tx:
-                        logger.info(
-                            f"⚠️ DUPLICATE WEBHOOK: Invoice {stripe_invoice_id} already processed. "
-                            f"Skipping credit grant. Transaction ID: {existing_tx.id}"
-                        )
-                        return {
-                            "duplicate": True,
-                            "transaction_id": str(existing_tx.id),
-                            "previous_balance": existing_tx.previous_balance,
-                            "credits_added": 0,
-                            "new_balance": existing_tx.new_balance
-                        }
-
                 # Check for duplicate checkout sessions (top-up purchases)
                 if stripe_session_id:
                     existing = await self.db.execute(
@@ -177,10 +152,10 @@ class CreditService:
                     )
                     raise ValueError("Credit balance cannot be negative")
 
-                user.credits = new_balance
-
                 # 📝 CREATE AUDIT RECORD
-                transaction = CreditTransaction(
+                transaction_id = uuid4()
+                transaction_values = dict(
+                    id=transaction_id,
                     user_id=user_id,
                     subscription_id=subscription_id,
                     transaction_type=transaction_type,
@@ -194,11 +169,45 @@ class CreditService:
                     top_up_package=top_up_package,
                     discount_applied=discount_applied,
                     amount_cents=amount_cents,
+                    currency='USD' if amount_cents is not None else None,
                     status='completed',
                     completed_at=utcnow_naive()
                 )
 
-                self.db.add(transaction)
+                if stripe_invoice_id:
+                    # 🔍 IDEMPOTENCY: the unique index on stripe_invoice_id rejects a
+                    # second row for the same invoice, so insert-or-skip in one
+                    # statement and only look up the original on a duplicate
+                    result = await self.db.execute(
+                        pg_insert(CreditTransaction)
+                        .values(**transaction_values)
+                        .on_conflict_do_nothing(
+                            index_elements=[CreditTransaction.stripe_invoice_id],
+                            index_where=CreditTransaction.stripe_invoice_id.isnot(None)
+                        )
+                        .returning(CreditTransaction.id)
+                    )
+                    if result.scalar_one_or_none() is None:
+                        existing = await self.db.execute(
+                            select(CreditTransaction.id, CreditTransaction.previous_balance, CreditTransaction.new_balance)
+                            .where(CreditTransaction.stripe_invoice_id == stripe_invoice_id)
+                        )
+                        existing_tx = existing.one()
+                        logger.info(
+                            f"⚠️ DUPLICATE WEBHOOK: Invoice {stripe_invoice_id} already processed. "
+                            f"Skipping credit grant. Transaction ID: {existing_tx.id}"
+                        )
+                        return {
+                            "duplicate": True,
+                            "transaction_id": str(existing_tx.id),
+                            "previous_balance": existing_tx.previous_balance,
+                            "credits_added": 0,
+                            "new_balance": existing_tx.new_balance
+                        }
+                else:
+                    self.db.add(CreditTransaction(**transaction_values))
+
+                user.credits = new_balance
                 await self.db.flush()  # Write to DB but don't commit yet
 
                 logger.info(
@@ -208,7 +217,7 @@ class CreditService:
 
                 return {
                     "duplicate": False,
-                    "transaction_id": str(transaction.id),
+                    "transaction_id": str(transaction_id),
                     "previous_balance": previous_balance,
                     "credits_added": credits,
                     "new_balance": new_balance
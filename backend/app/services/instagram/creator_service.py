@@ -7,8 +7,9 @@ from typing import Optional, Dict, Any
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.core.database import utcnow_sql
 from app.models.instagram_creator import InstagramCreator
 from app.utils import utcnow_naive
 from app.services.storage.s3 import S3Storage
@@ -69,27 +70,9 @@ class CreatorService:
         if profile_data:
             creator_data = {**creator_data, 'profile_data': profile_data}
 
-        # Update or create creator
-        if creator:
-            logger.info(f"Updating Instagram creator info for @{username}")
-            creator = await self._update_creator(creator, creator_data)
-        else:
-            try:
-                logger.info(f"Creating new Instagram creator @{username}")
-                creator = await self._create_creator(creator_data)
-            except IntegrityError:
-                # Race condition: another process created this creator
-                # Roll back and fetch the existing creator
-                await self.db.rollback()
-                logger.info(f"Creator @{username} already exists (race condition), fetching...")
-                stmt = select(InstagramCreator).where(InstagramCreator.instagram_id == instagram_id)
-                result = await self.db.execute(stmt)
-                creator = result.scalar_one_or_none()
-
-                if not creator:
-                    raise Exception(f"Failed to get/create creator @{username}")
-
-        return creator
+        # Insert or refresh the creator row in a single statement
+        logger.info(f"{'Updating' if creator else 'Creating new'} Instagram creator @{username}")
+        return await self._upsert_creator(creator_data)
 
     def _is_fresh(self, creator: InstagramCreator) -> bool:
         """Check if creator data is fresh (< 24 hours old)"""
@@ -99,27 +82,60 @@ class CreatorService:
         age = utcnow_naive() - creator.last_fetched_at
         return age < CREATOR_CACHE_TTL
 
-    async def _create_creator(self, data: Dict[str, Any]) -> InstagramCreator:
-        """Create new creator in DB"""
+    async def _upsert_creator(self, data: Dict[str, Any]) -> InstagramCreator:
+        """
+        Insert the creator, or refresh the existing row, with one
+        INSERT ... ON CONFLICT (instagram_id) DO UPDATE ... RETURNING.
+        Concurrent workers creating the same creator converge on one row
+        instead of racing on the unique constraint.
+        """
         # Extract profile stats if available
         profile_data = data.get('profile_data', {})
 
-        # Create creator first to get ID
-        creator = InstagramCreator(
-            instagram_id=data.get('creator_instagram_id', ''),
-            username=data.get('creator_username', ''),
-            full_name=data.get('creator_full_name', ''),
-            is_verified=data.get('creator_is_verified', False),
-            is_private=data.get('creator_is_private', False),
-            follower_count=profile_data.get('follower_count', 0),
-            following_count=profile_data.get('following_count', 0),
-            media_count=profile_data.get('media_count', 0),
-            last_fetched_at=utcnow_naive()
+        values = {
+            'instagram_id': data.get('creator_instagram_id', ''),
+            'username': data.get('creator_username', ''),
+            'full_name': data.get('creator_full_name', ''),
+            'is_verified': data.get('creator_is_verified', False),
+            'is_private': data.get('creator_is_private', False),
+            'follower_count': profile_data.get('follower_count', 0),
+            'following_count': profile_data.get('following_count', 0),
+            'media_count': profile_data.get('media_count', 0),
+            'last_fetched_at': utcnow_naive()
+        }
+
+        # On refresh, only overwrite what this fetch actually returned
+        refreshed_columns = ['last_fetched_at']
+        refreshed_columns += [
+            column for column, key in (
+                ('full_name', 'creator_full_name'),
+                ('is_verified', 'creator_is_verified'),
+                ('is_private', 'creator_is_private')
+            )
+            if key in data
+        ]
+        refreshed_columns += [
+            column for column in ('follower_count', 'following_count', 'media_count')
+            if column in profile_data
+        ]
+
+        stmt = pg_insert(InstagramCreator).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InstagramCreator.instagram_id],
+            set_={
+                **{column: stmt.excluded[column] for column in refreshed_columns},
+                # ON CONFLICT DO UPDATE doesn't apply Column.onupdate
+                'updated_at': utcnow_sql
+            }
         )
-
-        self.db.add(creator)
+        result = await self.db.scalars(
+            stmt.returning(InstagramCreator),
+            execution_options={"populate_existing": True}
+        )
+        creator = result.one()
+        # Commit before the slow picture transfer so the row lock (or, for a
+        # new creator, the reserved instagram_id) isn't held across it
         await self.db.commit()
-        await self.db.refresh(creator)
 
         # Download and upload profile picture to our storage
         profile_pic_url = data.get('creator_profile_pic_url')
@@ -127,54 +143,19 @@ class CreatorService:
             storage = S3Storage()
             creator_id = str(creator.id)
 
-            stored_url = await storage.download_and_upload_url(
-                profile_pic_url,
-                f"instagram_creators/{creator_id}/profile_pic.jpg",
-                "image/jpeg"
-            )
-
-            creator.profile_pic_url = stored_url
-            await self.db.commit()
-            await self.db.refresh(creator)
-
-        logger.info(f"Created new Instagram creator @{creator.username}")
-        return creator
-
-    async def _update_creator(self, creator: InstagramCreator, data: Dict[str, Any]) -> InstagramCreator:
-        """Update existing creator with fresh data"""
-        # Extract profile stats if available
-        profile_data = data.get('profile_data', {})
-
-        creator.full_name = data.get('creator_full_name', creator.full_name)
-        creator.is_verified = data.get('creator_is_verified', creator.is_verified)
-        creator.is_private = data.get('creator_is_private', creator.is_private)
-
-        # Update stats if we fetched profile data
-        if profile_data:
-            creator.follower_count = profile_data.get('follower_count', creator.follower_count)
-            creator.following_count = profile_data.get('following_count', creator.following_count)
-            creator.media_count = profile_data.get('media_count', creator.media_count)
-
-        creator.last_fetched_at = utcnow_naive()
-
-        # Download and upload new profile picture to our storage
-        profile_pic_url = data.get('creator_profile_pic_url')
-        if profile_pic_url:
-            storage = S3Storage()
-            creator_id = str(creator.id)
-
             try:
                 stored_url = await storage.download_and_upload_url(
                     profile_pic_url,
                     f"instagram_creators/{creator_id}/profile_pic.jpg",
                     "image/jpeg"
                 )
-                creator.profile_pic_url = stored_url
             except Exception as e:
+                stored_url = None
                 logger.warning(f"Failed to update profile picture for @{creator.username}: {e}")
 
-        await self.db.commit()
-        await self.db.refresh(creator)
+            if stored_url:
+                creator.profile_pic_url = stored_url
+                await self.db.commit()
 
-        logger.info(f"Updated Instagram creator @{creator.username}")
+        logger.info(f"Saved Instagram creator @{creator.username}")
         return creator
@@ -10,9 +10,12 @@ from datetime import datetime
 import re
 
 from app.core.config import settings
+from app.utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
 
 class InstagramDownloader:
     """Downloads Instagram videos using RapidAPI"""
@@ -87,44 +90,45 @@ class InstagramDownloader:
         """Fetch video metadata from RapidAPI"""
         api_url = f"https://{self.api_host}/post?shortcode={shortcode}"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(api_url, headers=self.headers)
-                response.raise_for_status()
+        client = get_http_client()
+        try:
+            response = await client.get(api_url, headers=self.headers, timeout=30.0)
+            response.raise_for_status()
 
-                data = response.json()
+            data = response.json()
 
-                # The API returns the post data directly
-                return data
+            # The API returns the post data directly
+            return data
 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error fetching video data: {e.response.status_code}")
-                if e.response.status_code == 404:
-                    raise ValueError("Instagram post not found")
-                raise ValueError(f"Failed to fetch video data: HTTP {e.response.status_code}")
-            except Exception as e:
-                logger.error(f"Error fetching video data: {str(e)}")
-                raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching video data: {e.response.status_code}")
+            if e.response.status_code == 404:
+                raise ValueError("Instagram post not found")
+            raise ValueError(f"Failed to fetch video data: HTTP {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching video data: {str(e)}")
+            raise
 
     async def _download_file(self, url: str, output_path: str) -> None:
         """Download a file from URL to the specified path using streaming to reduce memory usage"""
-        async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-            try:
-                # Use streaming to avoid loading entire file into memory
-                async with client.stream('GET', url) as response:
-                    response.raise_for_status()
-
-                    # Write the content to file in chunks
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            f.write(chunk)
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error downloading file: {e.response.status_code}")
-                raise ValueError(f"Failed to download file: HTTP {e.response.status_code}")
-            except Exception as e:
-                logger.error(f"Error downloading file: {str(e)}")
-                raise
+        client = get_http_client()
+        try:
+            # Use streaming to avoid loading entire file into memory
+            async with client.stream('GET', url, timeout=60.0) as response:
+                response.raise_for_status()
+
+                # Write the content to file in 1 MiB chunks, with the disk
+                # writes offloaded so they don't stall the event loop
+                with open(output_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error downloading file: {e.response.status_code}")
+            raise ValueError(f"Failed to download file: HTTP {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error downloading file: {str(e)}")
+            raise
 
     def _format_metadata(self, api_data: Dict[str, Any], video_path: str) -> Dict[str, Any]:
         """Format API response into our metadata structure"""
@@ -234,23 +238,23 @@ class InstagramDownloader:
         """
         api_url = f"https://{self.api_host}/profile?username={username}"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(api_url, headers=self.headers)
-                response.raise_for_status()
-
-                data = response.json()
-                logger.info(f"Successfully fetched Instagram profile for @{username}")
-                return data
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error fetching Instagram profile: {e.response.status_code}")
-                if e.response.status_code == 404:
-                    raise ValueError("Instagram user not found")
-                raise ValueError(f"Failed to fetch profile data: HTTP {e.response.status_code}")
-            except Exception as e:
-                logger.error(f"Error fetching Instagram profile: {str(e)}")
-                raise
+        client = get_http_client()
+        try:
+            response = await client.get(api_url, headers=self.headers, timeout=30.0)
+            response.raise_for_status()
+
+            data = response.json()
+            logger.info(f"Successfully fetched Instagram profile for @{username}")
+            return data
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching Instagram profile: {e.response.status_code}")
+            if e.response.status_code == 404:
+                raise ValueError("Instagram user not found")
+            raise ValueError(f"Failed to fetch profile data: HTTP {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching Instagram profile: {str(e)}")
+            raise
 
     async def get_post_info(self, shortcode: str) -> Dict[str, Any]:
         """Get post metadata without downloading"""
@@ -1,33 +1,83 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from functools import lru_cache
 from pathlib import Path
 import mimetypes
 import logging
-from typing import Optional
-import aiofiles
+from typing import BinaryIO, Optional, Tuple
 import asyncio
 import httpx
 import tempfile
 
 from app.core.config import settings
+from app.utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def _get_s3_client():
+    """
+    Process-wide S3 client shared by all S3Storage instances.
+    boto3 clients are thread-safe, so sharing one keeps its HTTP connection
+    pool (and TLS sessions) warm across uploads instead of rebuilding it per instance.
+
+    Transient errors are retried per request with exponential backoff ("standard"
+    mode). The transfer manager sends each multipart part as its own request, so
+    a failed part is re-sent on its own instead of failing the whole upload (and,
+    with it, the Inngest step that re-uploads every file).
+
+    The connection pool is sized for every concurrent upload moving all of its
+    parts at once; botocore's default of 10 would make concurrent uploads (e.g.
+    the WAV and MP3) queue for connections behind each other.
+    """
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or 'minioadmin',
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or 'minioadmin',
+        region_name=settings.AWS_REGION,
+        endpoint_url=settings.S3_ENDPOINT_URL or 'http://localhost:9000',
+        config=Config(
+            retries={'max_attempts': settings.S3_MAX_RETRY_ATTEMPTS, 'mode': 'standard'},
+            max_pool_connections=settings.S3_MAX_CONCURRENCY * settings.PIPELINE_UPLOAD_CONCURRENCY
+        )
+    )
+
+
+class _CountingReader:
+    """File-like wrapper that counts the bytes read through it"""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
 
 class S3Storage:
     """Handle file uploads to S3 or compatible storage"""
 
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None):
         # Configure S3 client
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID or 'minioadmin',
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or 'minioadmin',
-            region_name=settings.AWS_REGION,
-            endpoint_url=settings.S3_ENDPOINT_URL or 'http://localhost:9000'
-        )
+        self.s3_client = _get_s3_client()
         self.bucket_name = settings.S3_BUCKET_NAME
 
+        # Multipart settings for file transfers - large WAVs are split into parts
+        # that upload (and download) concurrently instead of a single serial request
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=max_concurrency or settings.S3_MAX_CONCURRENCY,
+            use_threads=True
+        )
+
     async def upload_file(self, file_path: str, object_key: str) -> str:
         """
         Upload file to S3 and return public URL
@@ -43,18 +93,16 @@ class S3Storage:
             content_type = 'application/octet-stream'
 
         try:
-            # Read file
-            async with aiofiles.open(file_path, 'rb') as f:
-                file_data = await f.read()
-
-            # Upload to S3 (run in executor for sync boto3 call)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._upload_to_s3,
-                file_data,
-                object_key,
-                content_type
+            # Upload to S3 straight from disk (run in executor for sync boto3 call).
+            # boto3's transfer manager switches to concurrent multipart uploads above
+            # the threshold, so large files are never read fully into memory.
+            await asyncio.to_thread(
+                self.s3_client.upload_file,
+                Filename=str(file_path),
+                Bucket=self.bucket_name,
+                Key=object_key,
+                ExtraArgs=self._build_upload_args(content_type),
+                Config=self.transfer_config
             )
 
             # Generate public URL
@@ -70,13 +118,38 @@ class S3Storage:
             logger.error(f"Unexpected error during upload: {str(e)}")
             raise
 
-    def _upload_to_s3(self, file_data: bytes, object_key: str, content_type: str):
-        """Synchronous S3/R2 upload"""
-        # R2 doesn't support ACL parameter - use bucket-level public access instead
-        upload_params = {
-            'Bucket': self.bucket_name,
-            'Key': object_key,
-            'Body': file_data,
+    async def upload_stream(self, stream: BinaryIO, object_key: str, content_type: str) -> Tuple[str, int]:
+        """
+        Upload a non-seekable stream (e.g. a subprocess's stdout) to S3 as it is
+        produced, without staging it on disk. Returns the public URL and the
+        number of bytes uploaded.
+        """
+        counter = _CountingReader(stream)
+
+        try:
+            # The transfer manager buffers one part at a time, so memory stays
+            # bounded by the multipart chunk size regardless of stream length
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
+                Fileobj=counter,
+                Bucket=self.bucket_name,
+                Key=object_key,
+                ExtraArgs=self._build_upload_args(content_type),
+                Config=self.transfer_config
+            )
+
+            url = self.get_public_url(object_key)
+            logger.info(f"Successfully streamed {object_key} to S3 ({counter.bytes_read} bytes)")
+
+            return url, counter.bytes_read
+
+        except ClientError as e:
+            logger.error(f"S3 stream upload failed: {str(e)}")
+            raise
+
+    def _build_upload_args(self, content_type: str) -> dict:
+        """Build the object parameters shared by all uploads (content type, caching, ACL)"""
+        upload_args = {
             'ContentType': content_type
         }
 
@@ -88,19 +161,29 @@ class S3Storage:
             content_type == 'application/octet-stream'
         ):
             # Cache for 1 year, marked as immutable
-            upload_params['CacheControl'] = 'public, max-age=31536000, immutable'
+            upload_args['CacheControl'] = 'public, max-age=31536000, immutable'
 
         # Enable byte-range requests for audio files (critical for progressive download)
         if content_type and content_type.startswith('audio/'):
-            upload_params['Metadata'] = {
+            upload_args['Metadata'] = {
                 'accept-ranges': 'bytes'
             }
 
+        # R2 doesn't support ACL parameter - use bucket-level public access instead
         # Only add ACL for S3, not for R2
         if settings.STORAGE_TYPE != "r2":
-            upload_params['ACL'] = 'public-read'
+            upload_args['ACL'] = 'public-read'
+
+        return upload_args
 
-        self.s3_client.put_object(**upload_params)
+    def _upload_to_s3(self, file_data: bytes, object_key: str, content_type: str):
+        """Synchronous S3/R2 upload"""
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=object_key,
+            Body=file_data,
+            **self._build_upload_args(content_type)
+        )
 
     async def download_and_upload_url(self, url: str, object_key: str, content_type: Optional[str] = None) -> Optional[str]:
         """
@@ -121,14 +204,13 @@ class S3Storage:
         try:
             # Download from external URL
             logger.info(f"Downloading from URL: {url}")
-            async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                file_data = response.content
+            response = await get_http_client().get(url, timeout=60.0)
+            response.raise_for_status()
+            file_data = response.content
 
-                # Use response content type if not provided
-                if not content_type:
-                    content_type = response.headers.get('content-type', 'application/octet-stream')
+            # Use response content type if not provided
+            if not content_type:
+                content_type = response.headers.get('content-type', 'application/octet-stream')
 
             # Upload to our storage
             loop = asyncio.get_event_loop()
@@ -163,14 +245,15 @@ class S3Storage:
         destination.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            # Download from S3 (run in executor for sync boto3 call)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
+            # Download from S3 (run in a thread for the sync boto3 call). With the
+            # shared transfer config, large objects (e.g. sample WAVs for stem
+            # separation) are fetched as concurrent ranged GETs like multipart uploads.
+            await asyncio.to_thread(
                 self.s3_client.download_file,
-                self.bucket_name,
-                object_key,
-                str(destination)
+                Bucket=self.bucket_name,
+                Key=object_key,
+                Filename=str(destination),
+                Config=self.transfer_config
             )
 
             logger.info(f"Successfully downloaded {object_key} from S3")
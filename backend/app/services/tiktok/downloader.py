@@ -1,7 +1,9 @@
 import os
 import tempfile
 import asyncio
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 import logging
 import httpx
@@ -10,9 +12,38 @@ from datetime import datetime
 import re
 
 from app.core.config import settings
+from app.utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# In-process cache of TikTok URL -> video API response. Re-submissions and
+# retried download steps for the same URL skip the RapidAPI round trip
+_VIDEO_DATA_CACHE_MAX_SIZE = 1_000
+_video_data_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _get_cached_video_data(url: str) -> Optional[Dict[str, Any]]:
+    """Return the cached API response for a URL, if present and not expired"""
+    entry = _video_data_cache.get(url)
+    if entry is None:
+        return None
+
+    expires_at, video_data = entry
+    if expires_at < time.monotonic():
+        _video_data_cache.pop(url, None)
+        return None
+    return video_data
+
+
+def _cache_video_data(url: str, video_data: Dict[str, Any]) -> None:
+    """Cache an API response, evicting the oldest entries beyond the size limit"""
+    _video_data_cache[url] = (time.monotonic() + settings.TIKTOK_VIDEO_DATA_CACHE_TTL_SECONDS, video_data)
+    _video_data_cache.move_to_end(url)
+    while len(_video_data_cache) > _VIDEO_DATA_CACHE_MAX_SIZE:
+        _video_data_cache.popitem(last=False)
+
 
 class TikTokDownloader:
     """Downloads TikTok videos using RapidAPI"""
@@ -79,51 +110,60 @@ class TikTokDownloader:
             raise
 
     async def _fetch_video_data(self, url: str) -> Dict[str, Any]:
-        """Fetch video metadata from RapidAPI"""
+        """Fetch video metadata from RapidAPI (cached per URL for a few minutes)"""
+        cached = _get_cached_video_data(url)
+        if cached is not None:
+            logger.info(f"Using cached video data for {url}")
+            return cached
+
         # Encode the URL for the API
         encoded_url = quote(url, safe='')
         api_url = f"https://{self.api_host}/?url={encoded_url}&hd=1"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(api_url, headers=self.headers)
-                response.raise_for_status()
+        client = get_http_client()
+        try:
+            response = await client.get(api_url, headers=self.headers, timeout=30.0)
+            response.raise_for_status()
 
-                data = response.json()
+            data = response.json()
 
-                # Check if the API returned success
-                if data.get('code') != 0:
-                    error_msg = data.get('msg', 'Unknown error')
-                    raise ValueError(f"API error: {error_msg}")
+            # Check if the API returned success
+            if data.get('code') != 0:
+                error_msg = data.get('msg', 'Unknown error')
+                raise ValueError(f"API error: {error_msg}")
 
-                return data.get('data', {})
+            video_data = data.get('data', {})
+            if video_data:
+                _cache_video_data(url, video_data)
+            return video_data
 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error fetching video data: {e.response.status_code}")
-                raise ValueError(f"Failed to fetch video data: HTTP {e.response.status_code}")
-            except Exception as e:
-                logger.error(f"Error fetching video data: {str(e)}")
-                raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching video data: {e.response.status_code}")
+            raise ValueError(f"Failed to fetch video data: HTTP {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching video data: {str(e)}")
+            raise
 
     async def _download_file(self, url: str, output_path: str) -> None:
         """Download a file from URL to the specified path using streaming to reduce memory usage"""
-        async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-            try:
-                # Use streaming to avoid loading entire file into memory
-                async with client.stream('GET', url) as response:
-                    response.raise_for_status()
-
-                    # Write the content to file in chunks
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
-                            f.write(chunk)
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error downloading file: {e.response.status_code}")
-                raise ValueError(f"Failed to download file: HTTP {e.response.status_code}")
-            except Exception as e:
-                logger.error(f"Error downloading file: {str(e)}")
-                raise
+        client = get_http_client()
+        try:
+            # Use streaming to avoid loading entire file into memory
+            async with client.stream('GET', url, timeout=60.0) as response:
+                response.raise_for_status()
+
+                # Write the content to file in 1 MiB chunks, with the disk
+                # writes offloaded so they don't stall the event loop
+                with open(output_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error downloading file: {e.response.status_code}")
+            raise ValueError(f"Failed to download file: HTTP {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error downloading file: {str(e)}")
+            raise
 
     def _format_metadata(self, api_data: Dict[str, Any], video_path: str) -> Dict[str, Any]:
         """Format API response into our metadata structure"""
@@ -186,45 +226,45 @@ class TikTokDownloader:
         """Fetch user/creator information and stats from TikTok"""
         api_url = f"https://{self.api_host}/user/info?unique_id={unique_id}"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(api_url, headers=self.headers)
-                response.raise_for_status()
+        client = get_http_client()
+        try:
+            response = await client.get(api_url, headers=self.headers, timeout=30.0)
+            response.raise_for_status()
 
-                data = response.json()
-
-                # Check if the API returned success
-                if data.get('code') != 0:
-                    error_msg = data.get('msg', 'Unknown error')
-                    logger.warning(f"User info API error: {error_msg}")
-                    return {}
-
-                user_data = data.get('data', {})
-                user = user_data.get('user', {})
-                stats = user_data.get('stats', {})
-
-                return {
-                    'creator_id': user.get('id', ''),
-                    'creator_username': user.get('uniqueId', ''),
-                    'creator_name': user.get('nickname', ''),
-                    'creator_avatar_thumb': user.get('avatarThumb', ''),
-                    'creator_avatar_medium': user.get('avatarMedium', ''),
-                    'creator_avatar_large': user.get('avatarLarger', ''),
-                    'creator_signature': user.get('signature', ''),
-                    'creator_verified': user.get('verified', False),
-                    'creator_follower_count': stats.get('followerCount', 0),
-                    'creator_following_count': stats.get('followingCount', 0),
-                    'creator_heart_count': stats.get('heartCount', 0),
-                    'creator_video_count': stats.get('videoCount', 0),
-                }
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error fetching user info: {e.response.status_code}")
-                return {}
-            except Exception as e:
-                logger.error(f"Error fetching user info: {str(e)}")
+            data = response.json()
+
+            # Check if the API returned success
+            if data.get('code') != 0:
+                error_msg = data.get('msg', 'Unknown error')
+                logger.warning(f"User info API error: {error_msg}")
                 return {}
 
+            user_data = data.get('data', {})
+            user = user_data.get('user', {})
+            stats = user_data.get('stats', {})
+
+            return {
+                'creator_id': user.get('id', ''),
+                'creator_username': user.get('uniqueId', ''),
+                'creator_name': user.get('nickname', ''),
+                'creator_avatar_thumb': user.get('avatarThumb', ''),
+                'creator_avatar_medium': user.get('avatarMedium', ''),
+                'creator_avatar_large': user.get('avatarLarger', ''),
+                'creator_signature': user.get('signature', ''),
+                'creator_verified': user.get('verified', False),
+                'creator_follower_count': stats.get('followerCount', 0),
+                'creator_following_count': stats.get('followingCount', 0),
+                'creator_heart_count': stats.get('heartCount', 0),
+                'creator_video_count': stats.get('videoCount', 0),
+            }
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching user info: {e.response.status_code}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error fetching user info: {str(e)}")
+            return {}
+
     async def get_video_info(self, url: str) -> Dict[str, Any]:
         """Get video metadata without downloading"""
         try:
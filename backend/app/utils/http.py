@@ -0,0 +1,31 @@
+"""
+Shared HTTP client for outbound API and CDN requests.
+
+Creating an httpx.AsyncClient per request throws away its connection pool, so
+every RapidAPI call or video download pays a fresh DNS lookup, TCP connect and
+TLS handshake. Services use this process-wide client instead and pass their
+own timeouts per request.
+"""
+
+import asyncio
+from typing import Optional, Tuple
+
+import httpx
+
+_client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the running event loop.
+
+    httpx clients are bound to the loop they were first used on, so a new
+    client is created if called from a different loop (e.g. a script that
+    calls asyncio.run more than once).
+    """
+    global _client
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client[0] is not loop or _client[1].is_closed:
+        _client = (loop, httpx.AsyncClient(follow_redirects=True))
+    return _client[1]
@@ -5,6 +5,10 @@ import re
 from typing import List
 
 
+# Match hashtags: # followed by word characters (letters, numbers, underscores)
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
 # Tags to filter out (common spam/low-value tags)
 FILTERED_TAGS = {
     'fyp', 'foryou', 'foryoupage', 'viral', 'viralvideo',
@@ -12,28 +16,22 @@ FILTERED_TAGS = {
 }
 
 
-def extract_hashtags(text: str) -> List[str]:
+def extract_hashtags(*texts: str) -> List[str]:
     """
-    Extract hashtags from text, filtering out common spam tags.
+    Extract hashtags from one or more texts, filtering out common spam tags.
 
     Args:
-        text: Text containing hashtags (e.g., "#beyonce #acoustic #fyp")
+        texts: Texts containing hashtags (e.g., "#beyonce #acoustic #fyp").
+            Empty/None texts are skipped.
 
     Returns:
-        List of hashtags without the # symbol, lowercased
+        List of hashtags without the # symbol, lowercased, in order of first appearance
         Example: ["beyonce", "acoustic"]
     """
-    if not text:
-        return []
-
-    # Match hashtags: # followed by word characters (letters, numbers, underscores)
-    hashtag_pattern = r'#(\w+)'
-    hashtags = re.findall(hashtag_pattern, text)
-
     # Convert to lowercase and remove duplicates while preserving order
     seen = set()
     unique_hashtags = []
-    for tag in hashtags:
+    for tag in (match.group(1) for text in texts if text for match in HASHTAG_PATTERN.finditer(text)):
         tag_lower = tag.lower()
 
         # Skip if already seen
@@ -69,8 +67,8 @@ def remove_hashtags(text: str) -> str:
         return text
 
     # Remove hashtags and clean up extra spaces
-    text_without_hashtags = re.sub(r'#\w+', '', text)
+    text_without_hashtags = HASHTAG_PATTERN.sub('', text)
     # Clean up multiple spaces and strip
-    text_cleaned = re.sub(r'\s+', ' ', text_without_hashtags).strip()
+    text_cleaned = WHITESPACE_PATTERN.sub(' ', text_without_hashtags).strip()
 
     return text_cleaned
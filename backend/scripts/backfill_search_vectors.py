@@ -31,11 +31,8 @@ def create_index_concurrently():
     CREATE INDEX CONCURRENTLY cannot run inside a transaction,
     so we use a synchronous connection with autocommit isolation.
     """
-    # Convert asyncpg URL to psycopg2 URL
-    sync_url = settings.DATABASE_URL.replace('postgresql+asyncpg://', 'postgresql://')
-
-    # Create synchronous engine with autocommit isolation
-    sync_engine = create_engine(sync_url, isolation_level="AUTOCOMMIT")
+    # Create synchronous (psycopg2) engine with autocommit isolation
+    sync_engine = create_engine(settings.SYNC_DATABASE_URL, isolation_level="AUTOCOMMIT")
 
     try:
         with sync_engine.connect() as conn:
@@ -91,7 +88,7 @@ async def backfill_search_vectors():
               setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
               setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
               setweight(to_tsvector('english', coalesce(creator_username, '')), 'C') ||
-              setweight(to_tsvector('english', coalesce((SELECT string_agg(value, ' ') FROM jsonb_array_elements_text(tags)), '')), 'D')
+              setweight(to_tsvector('english', coalesce(array_to_string(tags, ' '), '')), 'D')
             WHERE search_vector IS NULL
         """)
 